@@ -1,17 +1,54 @@
 from flask import Flask, render_template, request, jsonify
+from flask_sock import Sock
+import hmac
+import json
 import os
-from script import analyze_phoneme_accuracy
-from transformers import pipeline
-from pronunciation_analysis import setup_analyzer
-import librosa
+import time
+from functools import wraps
+from script import analyze_phoneme_accuracy, reference_phonemes
+from pronunciation_analysis import setup_analyzer, setup_remote_analyzer
+from batching import MicroBatcher
+from inference_pool import InferenceClient, LatencyStats
+from audio_io import AudioDecodeError, decode_audio, read_upload, sniff_container
+from startup import StartupState
+from result_cache import ANALYZER_VERSION, ResultCache, result_cache_key
+from rhythm import check_rhythm_metrics
+from streaming import StreamingSession
 from flask_cors import CORS
+import numpy as np
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app)
 
 model_name = "adilism/wav2vec2-large-xlsr-kazakh"
-asr_pipeline = None
+max_batch_size = int(os.environ.get("ASR_MAX_BATCH_SIZE", "8"))
+max_wait_ms = float(os.environ.get("ASR_MAX_WAIT_MS", "10"))
+# fp32, int8, onnx or onnx-int8; see inference_backends.py and export_model.py
+inference_backend = os.environ.get("INFERENCE_BACKEND", "fp32")
+model_export_dir = os.environ.get("MODEL_EXPORT_DIR", "models")
+# soxr quality for uploads not already at 16 kHz: VHQ, HQ (librosa's default), MQ, LQ
+resample_quality = os.environ.get("RESAMPLE_QUALITY", "HQ")
+# WAV, FLAC, Ogg (Vorbis/Opus) and WebM uploads up to these limits are accepted
+audio_max_duration = float(os.environ.get("AUDIO_MAX_SECONDS", "30"))
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("AUDIO_MAX_MB", "10")) * 2**20
+decode_latency = {}
+# When > 0 the model lives in inference_pool.py processes (started by
+# gunicorn.conf.py) and web workers only submit jobs to it
+inference_pool_size = int(os.environ.get("INFERENCE_POOL_SIZE", "0"))
+# /metrics/* need "Authorization: Bearer <METRICS_TOKEN>" and are off without one
+metrics_token = os.environ.get("METRICS_TOKEN")
+asr_batcher = None
 analyzer = None
+startup_state = StartupState()
+# Identical audio + word returns the stored analysis without touching the model
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_SIZE", "256")),
+    disk_dir=os.environ.get("RESULT_CACHE_DIR") or None,
+    max_disk_bytes=int(os.environ.get("RESULT_CACHE_MAX_MB", "256")) * 2**20,
+)
+# Different backends can decode differently, so they must not share entries
+result_cache_version = f"{ANALYZER_VERSION}:{model_name}:{inference_backend}"
 
 KAZAKH_WORDS = [
     {"word": "рақмет", "translation": "thank you", "phonetic": "ɾɑqmɛt"},
@@ -25,12 +62,64 @@ KAZAKH_WORDS = [
     {"word": "қала", "translation": "city", "phonetic": "qɑlɑ"},
     {"word": "күн", "translation": "sun/day", "phonetic": "kyn"},
 ]
+# Letters and IPA of each word, computed once instead of per request
+REFERENCE_PHONEMES = [reference_phonemes(word["word"]) for word in KAZAKH_WORDS]
 
 
 def init_model():
-    global asr_pipeline, analyzer
-    asr_pipeline = pipeline("automatic-speech-recognition", model=model_name)
-    analyzer = setup_analyzer(model_name)
+    global asr_batcher, analyzer
+    if inference_pool_size:
+        with startup_state.phase("load_processor"):
+            model = setup_remote_analyzer(model_name)
+
+        with startup_state.phase("connect_pool"):
+            batcher = InferenceClient()
+            batcher.wait_until_available()
+    else:
+        # One model copy serves both transcription and pronunciation analysis
+        with startup_state.phase("load_model"):
+            model = setup_analyzer(
+                model_name, backend=inference_backend, export_dir=model_export_dir
+            )
+
+        with startup_state.phase("start_batcher"):
+            batcher = MicroBatcher(
+                model.model,
+                model.processor,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+            )
+
+    with startup_state.phase("warmup"):
+        warmup(model, batcher)
+
+    analyzer, asr_batcher = model, batcher
+
+
+def warmup(model, batcher):
+    """Run a synthetic request so the first real one skips first-call costs"""
+    rng = np.random.default_rng(0)
+    waveform = (rng.standard_normal(16000) * 0.1).astype(np.float32)
+    transcription = batcher.transcribe(waveform)
+    model.analyze_pronunciation(
+        waveform=waveform,
+        sample_rate=16000,
+        reference_text=KAZAKH_WORDS[0]["word"],
+        predicted_text=transcription.text,
+        logits=transcription.logits,
+    )
+    # Scores are only comparable with older attempts while the peaks match
+    check_rhythm_metrics()
+
+
+def log_startup_report(report):
+    phases = ", ".join(
+        f"{name}={seconds}s" for name, seconds in report["phases"].items()
+    )
+    if report["status"] == "ready":
+        print(f"Model ready in {report['total_seconds']}s ({phases})")
+    else:
+        app.logger.error(f"Model loading failed: {report['error']} ({phases})")
 
 
 @app.route("/")
@@ -43,8 +132,54 @@ def health_check():
     return jsonify({"status": "ok"})
 
 
+@app.route("/ready")
+def readiness_check():
+    report = startup_state.report()
+    return jsonify(report), 200 if startup_state.ready else 503
+
+
+def metrics_auth(view):
+    """Hide the metrics from anyone without the configured token"""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not metrics_token:
+            return jsonify({"error": "Not found"}), 404
+        header = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(header, f"Bearer {metrics_token}"):
+            return jsonify({"error": "Unauthorized"}), 401
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@app.route("/metrics/inference")
+@metrics_auth
+def inference_metrics():
+    if not startup_state.ready:
+        return jsonify({"error": "Model is still loading"}), 503
+    return jsonify(asr_batcher.stats())
+
+
+@app.route("/metrics/decode")
+@metrics_auth
+def decode_metrics():
+    return jsonify(
+        {container: stats.summary() for container, stats in decode_latency.items()}
+    )
+
+
+@app.route("/metrics/cache")
+@metrics_auth
+def cache_metrics():
+    return jsonify(result_cache.stats())
+
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
+    if not startup_state.ready:
+        return jsonify({"error": "Model is still loading, try again shortly"}), 503
+
     if "audio" not in request.files:
         return jsonify({"error": "No audio file provided"}), 400
 
@@ -55,53 +190,129 @@ def analyze():
         return jsonify({"error": "Invalid word index"}), 400
 
     reference_text = KAZAKH_WORDS[word_index]["word"]
-    temp_path = "temp_audio.wav"
 
     try:
-        # Save audio file
-        audio_file.save(temp_path)
+        # Decode the upload in memory; the same buffer feeds ASR and analysis
+        audio_bytes = read_upload(audio_file)
+        container = sniff_container(audio_bytes) or "unknown"
+        start = time.perf_counter()
+        waveform, sample_rate = decode_audio(
+            audio_bytes,
+            resample_quality=resample_quality,
+            max_duration=audio_max_duration,
+        )
+        decode_latency.setdefault(container, LatencyStats()).add(
+            time.perf_counter() - start
+        )
 
-        # Load audio for analysis
-        waveform, sample_rate = librosa.load(temp_path, sr=16000)
+        cache_key = result_cache_key(waveform, reference_text, result_cache_version)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
 
-        # Get ASR result first
-        result = asr_pipeline(temp_path)
-        predicted_text = result["text"]
+        # Get ASR result first, batched with any concurrent requests
+        transcription = asr_batcher.transcribe(waveform)
+        predicted_text = transcription.text
 
         # Get phoneme analysis
-        phoneme_analysis = analyze_phoneme_accuracy(reference_text, predicted_text)
+        phoneme_analysis = analyze_phoneme_accuracy(
+            reference_text, predicted_text, REFERENCE_PHONEMES[word_index]
+        )
 
-        # Get pronunciation analysis with both waveform and predicted text
+        # Reuse the batched logits for confidence and timing, no second pass
         pronunciation_analysis = analyzer.analyze_pronunciation(
             waveform=waveform,
             sample_rate=sample_rate,
             reference_text=reference_text,
             predicted_text=predicted_text,
+            logits=transcription.logits,
         )
 
-        # Combine the analyses
-        response = {
-            "predicted_text": predicted_text,
-            "reference_text": reference_text,
-            "phoneme_analysis": pronunciation_analysis["phoneme_analysis"],
-            "pronunciation_score": pronunciation_analysis["pronunciation_score"],
-            "confidence": pronunciation_analysis["confidence"],
-            "timing_scores": pronunciation_analysis["timing_scores"],
-            "rhythm_metrics": pronunciation_analysis["rhythm_metrics"],
-            "detailed_feedback": pronunciation_analysis["detailed_feedback"],
-        }
-
+        response = build_response(
+            reference_text, predicted_text, pronunciation_analysis
+        )
+        # A failed analysis may succeed on retry; keep it out of the cache
+        if not pronunciation_analysis.get("failed"):
+            result_cache.put(cache_key, response)
         return jsonify(response)
 
+    except AudioDecodeError as e:
+        return jsonify({"error": str(e)}), 400
+
     except Exception as e:
         app.logger.error(f"Error processing audio: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+
+@sock.route("/stream")
+def stream(ws):
+    """Streaming analysis over a WebSocket
+
+    The client sends a JSON start message ({"word_index": n, "sample_rate":
+    48000, "format": "pcm_s16le"}), then binary PCM chunks while the learner
+    speaks, then {"event": "end"}. Partial transcriptions with interim
+    phoneme alignment are pushed back as they are decoded, followed by a
+    final message with the same fields as /analyze. A stream longer than
+    AUDIO_MAX_SECONDS ends with an error message instead.
+    """
+    if not startup_state.ready:
+        ws.send(json.dumps({"type": "error", "error": "Model is still loading"}))
+        return
+
+    try:
+        start = json.loads(ws.receive())
+        word_index = start.get("word_index")
+        if not isinstance(word_index, int) or not 0 <= word_index < len(KAZAKH_WORDS):
+            ws.send(json.dumps({"type": "error", "error": "Invalid word index"}))
+            return
+
+        reference_text = KAZAKH_WORDS[word_index]["word"]
+        sample_format = start.get("format", "pcm_s16le")
+        session = StreamingSession(
+            analyzer,
+            asr_batcher,
+            reference_text,
+            input_sample_rate=int(start.get("sample_rate", 16000)),
+            max_duration=audio_max_duration,
+        )
+
+        while True:
+            message = ws.receive()
+            if isinstance(message, (bytes, bytearray)):
+                partial = session.add_chunk(message, sample_format)
+                if partial is not None:
+                    ws.send(json.dumps({"type": "partial", **partial}))
+            elif json.loads(message).get("event") == "end":
+                break
+
+        pronunciation_analysis = session.finish()
+        response = build_response(
+            reference_text,
+            pronunciation_analysis["predicted_text"],
+            pronunciation_analysis,
+        )
+        ws.send(json.dumps({"type": "final", **response}))
+
+    except Exception as e:
+        app.logger.error(f"Error processing audio stream: {str(e)}")
+        ws.send(json.dumps({"type": "error", "error": str(e)}))
+
+
+def build_response(reference_text, predicted_text, pronunciation_analysis):
+    """Combine the analyses into the /analyze response shape"""
+    return {
+        "predicted_text": predicted_text,
+        "reference_text": reference_text,
+        "phoneme_analysis": pronunciation_analysis["phoneme_analysis"],
+        "pronunciation_score": pronunciation_analysis["pronunciation_score"],
+        "confidence": pronunciation_analysis["confidence"],
+        "timing_scores": pronunciation_analysis["timing_scores"],
+        "rhythm_metrics": pronunciation_analysis["rhythm_metrics"],
+        "detailed_feedback": pronunciation_analysis["detailed_feedback"],
+    }
 
 
-init_model()
+# Load in the background so /health and /ready answer while the model loads
+startup_state.run_in_background(init_model, on_done=log_startup_report)
 if __name__ == "__main__":
     app.run(debug=True)
@@ -1,3 +1,4 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -13,6 +14,12 @@ migrate = Migrate()
 login_manager = LoginManager()
 jwt = JWTManager()
 
+def _running_cli_command():
+    """True when a `flask` command other than `flask run` is loading the app"""
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.info_name != 'run'
+
+
 def create_app(config_name='default') -> Flask:
     app = Flask(__name__)
     app.config.from_object(config[config_name])
@@ -23,6 +30,9 @@ def create_app(config_name='default') -> Flask:
     login_manager.init_app(app)
     jwt.init_app(app)
     CORS(app)
+
+    from app.utils.timing import init_timing
+    init_timing(app)
     
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -31,6 +41,7 @@ def create_app(config_name='default') -> Flask:
     from app.routes.word_categories import categories_bp
     from app.routes.favorites import favorites_bp
     from app.routes.stats import stats_bp
+    from app.routes.health import health_bp
     # from app.routes.progress import progress_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -39,16 +50,77 @@ def create_app(config_name='default') -> Flask:
     app.register_blueprint(categories_bp, url_prefix='/api/categories')
     app.register_blueprint(favorites_bp, url_prefix='/api/favorites')
     app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    app.register_blueprint(health_bp)
     # app.register_blueprint(progress_bp, url_prefix='/api/progress')
 
-    with app.app_context():
-        from app.utils.speech_recognition import init_speech_model
-        init_speech_model()
-        print('Speech recognition models initialized successfully')
+    from app.utils.startup import StartupState
+    startup_state = StartupState()
+    app.extensions['startup'] = startup_state
+
+    from app.utils.tts_cache import TTSCache
+    app.extensions['tts_cache'] = TTSCache(
+        app.config['TTS_CACHE_DIR'],
+        max_entries=app.config['TTS_CACHE_SIZE'],
+    )
+
+    from app.utils.reference_phonemes import ReferenceTable
+    app.extensions['reference_phonemes'] = ReferenceTable()
+
+    from app.commands import stats_cli, tts_cli
+    app.cli.add_command(tts_cli)
+    app.cli.add_command(stats_cli)
+
+    from app.utils.jobs import JobQueue
+    app.extensions['jobs'] = JobQueue(
+        app,
+        max_workers=app.config['ANALYZE_JOB_WORKERS'],
+        max_queued=app.config['ANALYZE_JOB_MAX_QUEUED'],
+        ttl=app.config['ANALYZE_JOB_TTL'],
+    )
+
+    def set_up_database():
+        # Before any request or background work: routes need the tables and seed data
+        with app.app_context():
+            with startup_state.phase('database'):
+                from app.utils.seed_database import seed_database
+                db.create_all()
+                seed_database()
+                print('Database seeded successfully')
+
+                from app.models.flashcards import Flashcard
+                references = app.extensions['reference_phonemes']
+                if references.load(Flashcard.query.all()):
+                    db.session.commit()
+                print(f'Loaded reference phonemes for {len(references)} flashcards')
+
+    def start_up():
+        # Runs in the background by default so /health and /ready answer at once
+        with app.app_context():
+            with startup_state.phase('speech_model'):
+                from app.utils.speech_recognition import init_speech_model
+                init_speech_model()
+
+            with startup_state.phase('warmup'):
+                from app.utils.speech_recognition import warmup_speech_model
+                warmup_speech_model()
+
+    def report_startup(report):
+        phases = ', '.join(f'{name}={seconds}s' for name, seconds in report['phases'].items())
+        if report['status'] == 'ready':
+            print(f"Application ready in {report['total_seconds']}s ({phases})")
+        else:
+            print(f"Application start-up failed: {report['error']} ({phases})")
+
+    if _running_cli_command():
+        # `flask db upgrade`, `flask stats backfill` and friends manage the
+        # schema themselves and need no models
+        return app
+
+    set_up_database()
+    if app.config['STARTUP_IN_BACKGROUND']:
+        startup_state.run_in_background(start_up, on_done=report_startup)
+    else:
+        startup_state.run(start_up)
+        report_startup(startup_state.report())
 
-        from app.utils.seed_database import seed_database
-        db.create_all()
-        seed_database()
-        print('Database seeded successfully')
-    
     return app
\ No newline at end of file
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.flashcards import Flashcard
+from app.models.phoneme_stats import PhonemeStat
+from app.models.user_progress import UserProgress
+from app.utils.phoneme_codec import phoneme_totals
+
+tts_cli = click.Group('tts', help='Text-to-speech cache management.')
+stats_cli = click.Group('stats', help='Practice statistics maintenance.')
+
+
+@tts_cli.command('prewarm')
+@click.option('--workers', default=4, show_default=True, help='Concurrent TTS API calls.')
+@with_appcontext
+def prewarm_tts(workers):
+    """Synthesize and cache audio for every flashcard word that is not cached yet."""
+    from app.utils.text_to_speech import get_pronunciation_audio
+
+    config = current_app.config
+    cache = current_app.extensions['tts_cache']
+    words = [word for (word,) in Flashcard.query.with_entities(Flashcard.word)]
+    missing = [
+        word for word in words
+        if not cache.contains(word, config['TTS_LANGUAGE'])
+    ]
+    click.echo(f'{len(words)} words, {len(words) - len(missing)} already cached')
+
+    app = current_app._get_current_object()
+
+    def warm(word):
+        with app.app_context():
+            get_pronunciation_audio(word)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(warm, word): word for word in missing}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                click.echo(f'cached {futures[future]}')
+            except Exception as e:
+                failed += 1
+                click.echo(f'failed {futures[future]}: {e}', err=True)
+
+    click.echo(f'Synthesized {len(missing) - failed} words, {failed} failed')
+
+
+@stats_cli.command('backfill')
+@click.option('--batch-size', default=1000, show_default=True, help='Attempts read per query.')
+@with_appcontext
+def backfill_phoneme_stats(batch_size):
+    """Rebuild the phoneme_stats table from every stored attempt."""
+    # CLI commands skip start-up, so a fresh database has no tables yet
+    db.create_all()
+    deleted = PhonemeStat.query.delete()
+    click.echo(f'Cleared {deleted} phoneme stats rows')
+
+    # Attempts come grouped by (user, flashcard), in id order within each
+    attempts = db.session.query(
+        UserProgress.user_id,
+        UserProgress.flashcard_id,
+        UserProgress.phoneme_details_packed,
+    ).order_by(UserProgress.user_id, UserProgress.flashcard_id, UserProgress.id) \
+        .yield_per(batch_size)
+
+    def add(key, packed_values):
+        for phoneme, data in phoneme_totals(packed_values).items():
+            db.session.add(PhonemeStat(
+                user_id=key[0],
+                flashcard_id=key[1],
+                phoneme=phoneme,
+                correct=data['correct'],
+                incorrect=data['incorrect'],
+                total_similarity=data['total_similarity'],
+            ))
+
+    key, packed_values, groups, total = None, [], 0, 0
+    for user_id, flashcard_id, packed in attempts:
+        if (user_id, flashcard_id) != key:
+            if key is not None:
+                add(key, packed_values)
+                groups += 1
+            key, packed_values = (user_id, flashcard_id), []
+        packed_values.append(packed)
+        total += 1
+    if key is not None:
+        add(key, packed_values)
+        groups += 1
+
+    db.session.commit()
+    click.echo(f'Aggregated {total} attempts into stats for {groups} user/flashcard pairs')
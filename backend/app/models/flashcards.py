@@ -1,5 +1,9 @@
+from flask import url_for
+from sqlalchemy.orm import validates
+
 from app import db
 from app.models.associations import flashcard_categories
+from app.utils.reference_phonemes import pack_reference, unpack_reference
 from datetime import datetime, timezone
 
 class Flashcard(db.Model):
@@ -12,6 +16,9 @@ class Flashcard(db.Model):
     rus_translation = db.Column(db.String(64))
     phonetic = db.Column(db.String(64), nullable=False)
     audio = db.Column(db.String(256), nullable=False, default='default.wav')
+    # Derived from word whenever it is set; see app.utils.reference_phonemes
+    reference_ipa = db.Column(db.JSON)
+    reference_phonemes = db.Column(db.LargeBinary)
 
     categories = db.relationship('Category', secondary=flashcard_categories, backref=db.backref('flashcards', lazy='dynamic'))
 
@@ -34,6 +41,19 @@ class Flashcard(db.Model):
             "phonetic": phonetic
         }
         
+    @validates('word')
+    def _compute_reference(self, key, word):
+        self.reference_ipa, self.reference_phonemes = pack_reference(word)
+        return word
+
+    def reference(self):
+        """The word's ReferencePhonemes, recomputed if missing or stale"""
+        reference = unpack_reference(self.word, self.reference_ipa, self.reference_phonemes)
+        if reference is None:
+            self._compute_reference('word', self.word)
+            reference = unpack_reference(self.word, self.reference_ipa, self.reference_phonemes)
+        return reference
+        
     def __repr__(self):
         return f'<Flashcard {self.word} - {self.phonetic}>'
     
@@ -46,5 +66,12 @@ class Flashcard(db.Model):
             'eng_translation': self.eng_translation,
             'rus_translation': self.rus_translation,
             'phonetic': self.phonetic,
-            'audio': self.audio
-        }
\ No newline at end of file
+            'audio': self.audio,
+            'audio_url': self.audio_url()
+        }
+
+    def audio_url(self):
+        """Uploaded audio if the card has some, else the cached TTS pronunciation"""
+        if self.audio and self.audio != 'default.wav':
+            return f'/audio/{self.audio}'
+        return url_for('speech.get_word_audio', word_id=self.word_id)
\ No newline at end of file
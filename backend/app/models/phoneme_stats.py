@@ -0,0 +1,115 @@
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+
+_UPSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+class PhonemeStat(db.Model):
+    """Running per-letter totals of one user's attempts at one flashcard
+
+    Updated in the same commit as each UserProgress row, so the stats
+    routes read these instead of decoding every stored attempt. Rows of a
+    (user, flashcard) are inserted in the order their letters first came
+    up, and the routes list them in id order. `flask stats backfill`
+    rebuilds the table from user_progress.
+    """
+    __tablename__ = "phoneme_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id"), nullable=False)
+    flashcard_id = db.Column(db.Integer, db.ForeignKey("flashcards.word_id"), nullable=False, index=True)
+    phoneme = db.Column(db.String(1), nullable=False)
+
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    incorrect = db.Column(db.Integer, nullable=False, default=0)
+    total_similarity = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'flashcard_id', 'phoneme', name='phoneme_stat_uc'),
+    )
+
+    def __init__(self, user_id, flashcard_id, phoneme, correct=0, incorrect=0, total_similarity=0.0):
+        self.user_id = user_id
+        self.flashcard_id = flashcard_id
+        self.phoneme = phoneme
+        self.correct = correct
+        self.incorrect = incorrect
+        self.total_similarity = total_similarity
+
+    def __repr__(self):
+        return f'<PhonemeStat {self.user_id} - {self.flashcard_id} - {self.phoneme}>'
+
+    @classmethod
+    def add_totals(cls, user_id, flashcard_id, totals):
+        """Add phoneme_totals() output to the user's rows for the card, adding rows as needed
+
+        One INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL, so
+        concurrent attempts neither collide on phoneme_stat_uc nor
+        overwrite each other's counts. Nothing is committed here.
+        """
+        if not totals:
+            return
+        rows = [
+            {
+                "user_id": user_id,
+                "flashcard_id": flashcard_id,
+                "phoneme": phoneme,
+                "correct": data["correct"],
+                "incorrect": data["incorrect"],
+                "total_similarity": data["total_similarity"],
+            }
+            for phoneme, data in totals.items()
+        ]
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect not in _UPSERTS:
+            for row in rows:
+                cls._add_row(row)
+            return
+
+        statement = _UPSERTS[dialect](cls).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "flashcard_id", "phoneme"],
+            set_={
+                "correct": cls.correct + statement.excluded.correct,
+                "incorrect": cls.incorrect + statement.excluded.incorrect,
+                "total_similarity": cls.total_similarity + statement.excluded.total_similarity,
+            },
+        ))
+
+    @classmethod
+    def _add_row(cls, row):
+        """Insert-or-increment for databases without ON CONFLICT"""
+        increment = cls.query.filter_by(
+            user_id=row["user_id"], flashcard_id=row["flashcard_id"], phoneme=row["phoneme"]
+        )
+        values = {
+            cls.correct: cls.correct + row["correct"],
+            cls.incorrect: cls.incorrect + row["incorrect"],
+            cls.total_similarity: cls.total_similarity + row["total_similarity"],
+        }
+        if increment.update(values, synchronize_session=False):
+            return
+        try:
+            # A concurrent first attempt may insert the row first
+            with db.session.begin_nested():
+                db.session.add(cls(**row))
+        except IntegrityError:
+            increment.update(values, synchronize_session=False)
+
+    def to_dict(self):
+        return phoneme_stat_dict(self.phoneme, self.correct, self.incorrect, self.total_similarity)
+
+
+def phoneme_stat_dict(phoneme, correct, incorrect, total_similarity):
+    """One "phoneme_stats" entry of the stats routes"""
+    count = correct + incorrect
+    return {
+        "phoneme": phoneme,
+        "correct": correct,
+        "incorrect": incorrect,
+        "avg_similarity": round(total_similarity / count, 2) if count > 0 else 0,
+    }
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from app import db
+from app.utils.phoneme_codec import decode_phoneme_details, encode_phoneme_details
 
 class UserProgress(db.Model):
     __tablename__ = "user_progress"
@@ -11,7 +12,8 @@ class UserProgress(db.Model):
     accuracy = db.Column(db.Float, default=50.0)
     correct_phonemes = db.Column(db.Integer, default=0)
     total_phonemes = db.Column(db.Integer, default=0)
-    phoneme_details = db.Column(db.JSON)
+    # Packed by app.utils.phoneme_codec; use the phoneme_details property
+    phoneme_details_packed = db.Column(db.LargeBinary)
     predicted_text = db.Column(db.String)
     pronunciation_score = db.Column(db.Float)
     reference_text = db.Column(db.String)
@@ -48,3 +50,10 @@ class UserProgress(db.Model):
         self.rhythm_regularity = rhythm_regularity
         self.speech_rate = speech_rate
 
+    @property
+    def phoneme_details(self):
+        return decode_phoneme_details(self.phoneme_details_packed)
+
+    @phoneme_details.setter
+    def phoneme_details(self, details):
+        self.phoneme_details_packed = encode_phoneme_details(details)
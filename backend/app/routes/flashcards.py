@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app.models.user_progress import UserProgress
 from app.utils.get_next_due_card import get_next_flashcard_for_user_by_category, get_next_flashcard_for_user
 
@@ -58,6 +58,7 @@ def create_flashcard():
         # Add to database
         db.session.add(new_card)
         db.session.commit()
+        current_app.extensions['reference_phonemes'].put(new_card)
 
         return jsonify({'message': 'Flashcard created successfully'}), 201
     except IntegrityError:
@@ -89,6 +90,7 @@ def update_flashcard(word_id):
             return jsonify({'message': 'Flashcard not found'}), 404
         
         data = request.get_json()
+        old_word = flashcard.word
         if 'word' in data:
             flashcard.word = data['word']
         if 'eng_translation' in data:
@@ -103,6 +105,9 @@ def update_flashcard(word_id):
             flashcard.audio = data['audio']
         
         db.session.commit()
+        references = current_app.extensions['reference_phonemes']
+        references.remove(old_word)
+        references.put(flashcard)
         return jsonify({'message': 'Flashcard updated successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -115,6 +120,7 @@ def delete_flashcard(word_id):
         return jsonify({'message': 'Flashcard not found'}), 404
     db.session.delete(flashcard)
     db.session.commit()
+    current_app.extensions['reference_phonemes'].remove(flashcard.word)
     return jsonify({'message': 'Flashcard deleted successfully'}), 200
 
 @flashcards_bp.route("/categories/<int:category_id>", methods=['GET'])
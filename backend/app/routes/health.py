@@ -0,0 +1,66 @@
+from functools import wraps
+
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.models.user import User
+
+health_bp = Blueprint('health', __name__)
+
+
+def admin_required(view):
+    """Only users named in METRICS_ADMIN_USERS; the metrics expose service internals"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        user = User.query.get(int(get_jwt_identity()))
+        if user is None or user.username not in current_app.config['METRICS_ADMIN_USERS']:
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@health_bp.route('/health', methods=['GET'])
+def health_check():
+    return jsonify({'status': 'ok'}), 200
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    startup_state = current_app.extensions['startup']
+    return jsonify(startup_state.report()), 200 if startup_state.ready else 503
+
+
+@health_bp.route('/metrics/cache', methods=['GET'])
+@admin_required
+def cache_metrics():
+    from app.utils.speech_recognition import result_cache
+    if result_cache is None:
+        return jsonify({'error': 'Service is still starting up'}), 503
+    return jsonify(result_cache.stats()), 200
+
+
+@health_bp.route('/metrics/timing', methods=['GET'])
+@admin_required
+def timing_metrics():
+    return jsonify(current_app.extensions['timing'].snapshot()), 200
+
+
+@health_bp.route('/metrics/asr', methods=['GET'])
+@admin_required
+def asr_metrics():
+    from app.utils.speech_recognition import asr_backend
+    if asr_backend is None:
+        return jsonify({'error': 'Service is still starting up'}), 503
+    return jsonify(asr_backend.stats()), 200
+
+
+@health_bp.route('/metrics/jobs', methods=['GET'])
+@admin_required
+def job_metrics():
+    return jsonify(current_app.extensions['jobs'].stats()), 200
+
+
+@health_bp.route('/metrics/tts', methods=['GET'])
+@admin_required
+def tts_metrics():
+    return jsonify(current_app.extensions['tts_cache'].stats()), 200
@@ -1,19 +1,33 @@
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime, timezone
 
-from app import db
-from app.models.user_flashcards import UserFlashcard
-from app.models.user_progress import UserProgress
 from app.models.flashcards import Flashcard
-from app.utils.speech_recognition import analyze_audio
-from app.utils.text_to_speech import get_pronunciation
+from app.utils.speech_recognition import analyze_audio, analyze_audio_bytes
+from app.utils.asr_client import ASRUnavailableError
+from app.utils.audio_io import read_upload
+from app.utils.jobs import QueueFullError
+from app.utils.progress import record_attempt
+from app.utils.text_to_speech import get_pronunciation, get_pronunciation_audio
 
 speech_bp = Blueprint('speech', __name__)
 
+
+@speech_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    limit_mb = current_app.config['AUDIO_MAX_BYTES'] / (1024 * 1024)
+    return jsonify({'error': f'Recording is too large; the limit is {limit_mb:g} MB'}), 413
+
+
 @speech_bp.route('/analyze', methods=['POST'])
 @jwt_required()
 def analyze_speech():
+    if not current_app.extensions['startup'].ready:
+        return jsonify({"error": "Service is still starting up, try again shortly"}), 503
+
     if "audio" not in request.files:
         return jsonify({"error": "No audio file provided"}), 400
 
@@ -32,63 +46,97 @@ def analyze_speech():
     if not audio_file.filename:
         return jsonify({'error': 'No audio file selected'}), 400
 
-    if audio_file.filename.rsplit('.', 1)[-1].lower() != 'wav':
-        return jsonify({'error': 'Unsupported file type. Please upload a .wav file'}), 400
+    allowed = current_app.config['AUDIO_ALLOWED_EXTENSIONS']
+    if audio_file.filename.rsplit('.', 1)[-1].lower() not in allowed:
+        return jsonify({
+            'error': f"Unsupported file type. Please upload one of: {', '.join(sorted(allowed))}"
+        }), 400
+
+    current_user_id = int(get_jwt_identity())
+
+    if _wants_async():
+        # Keep the upload in memory and answer at once; the worker does the rest
+        try:
+            job = current_app.extensions['jobs'].submit(
+                current_user_id,
+                _analyze_and_record,
+                read_upload(audio_file),
+                reference_text,
+                current_user_id,
+                word_index,
+            )
+        except QueueFullError as e:
+            return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+        return jsonify(job.to_dict()), 202, {'Location': url_for('speech.get_job', job_id=job.id)}
 
     try:
         result = analyze_audio(audio_file, reference_text)
-
-        if "phoneme_analysis" not in result:
-            raise ValueError(f"Missing 'phoneme_analysis' in analysis result: {result}")
-
-        accuracy = result["phoneme_analysis"].get("accuracy")
-        if accuracy is None:
-            raise ValueError(f"Missing 'accuracy' in phoneme_analysis result: {result}")
-
-        current_user_id = get_jwt_identity()
-
-        # Get or create UserFlashcard
-        user_flashcard = UserFlashcard.query.filter_by(
-            user_id=int(current_user_id),
-            flashcard_id=word_index
-        ).first()
-
-        if not user_flashcard:
-            user_flashcard = UserFlashcard(
-                user_id=int(current_user_id),
-                flashcard_id=word_index
-            )
-            db.session.add(user_flashcard)
-
-        # Save UserProgress
-        user_progress = UserProgress(
-            user_id=int(current_user_id),
-            flashcard_id=word_index,
-            accuracy=accuracy,
-            correct_phonemes=result["phoneme_analysis"]["correct_phonemes"],
-            total_phonemes=result["phoneme_analysis"]["total_phonemes"],
-            phoneme_details=result["phoneme_analysis"]["phoneme_details"],
-            predicted_text=result["predicted_text"],
-            pronunciation_score=result["pronunciation_score"],
-            reference_text=result["reference_text"],
-            rhythm_regularity=result["rhythm_metrics"]["rhythm_regularity"],
-            speech_rate=result["rhythm_metrics"]["speech_rate"]
-        )
-        db.session.add(user_progress)
-
-        # Update SM-2 logic and commit everything
-        user_flashcard.review(accuracy)
-        db.session.commit()
+        record_attempt(current_user_id, word_index, result)
 
         return jsonify(result), 200
 
     except ValueError as ve:
         return jsonify({'error': str(ve)}), 400
 
+    except ASRUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _wants_async():
+    """?async=1 or an RFC 7240 'Prefer: respond-async' header"""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+
+def _analyze_and_record(audio_bytes, reference_text, user_id, flashcard_id):
+    """Job body: runs on the worker pool inside an app context"""
+    result = analyze_audio_bytes(audio_bytes, reference_text)
+    record_attempt(user_id, flashcard_id, result)
+    return result
+
+
+@speech_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = current_app.extensions['jobs'].get(job_id, int(get_jwt_identity()))
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@speech_bp.route('/jobs/<job_id>/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_job(job_id):
+    """Server-Sent Events: one 'status' event per change, then 'result' and close
+
+    EventSource cannot set headers, so this route also accepts ?jwt=<token>.
+    """
+    job = current_app.extensions['jobs'].get(job_id, int(get_jwt_identity()))
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        version = job.version
+        while not job.done:
+            yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+            new_version = job.wait_for_change(version, timeout=15)
+            while new_version == version and not job.done:
+                # Comment lines keep proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                new_version = job.wait_for_change(version, timeout=15)
+            version = new_version
+        yield f"event: result\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
 @speech_bp.route('/pronounce', methods=['POST'])
 @jwt_required()
 def get_correct_pronounciation():
@@ -108,6 +156,38 @@ def get_correct_pronounciation():
 
     try:
         res = get_pronunciation(reference_text_kaz)
-        return jsonify({'text': res['text'], 'base16_audio': res['audio']}), 200
+        return jsonify({
+            'text': res['text'],
+            'base16_audio': res['audio'],
+            'audio_url': url_for('speech.get_word_audio', word_id=flashcard.word_id),
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@speech_bp.route('/audio/<int:word_id>', methods=['GET'])
+def get_word_audio(word_id):
+    """Pronunciation audio as bytes, cacheable by browsers and CDNs
+
+    Public so an <audio src> can load it directly. The cache key doubles
+    as a strong ETag since a key's file never changes; send_file answers
+    If-None-Match with 304 and Range requests with 206.
+    """
+    flashcard = Flashcard.query.get(word_id)
+    if not flashcard:
+        return jsonify({'error': 'Flashcard not found'}), 404
+
+    try:
+        entry = get_pronunciation_audio(flashcard.word)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+    response = send_file(
+        entry.path,
+        mimetype='audio/wav',
+        etag=entry.key,
+        conditional=True,
+        max_age=current_app.config['TTS_AUDIO_MAX_AGE'],
+    )
+    response.cache_control.public = True
+    return response
\ No newline at end of file
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 from app import db
 from app.models.user_progress import UserProgress
+from app.models.phoneme_stats import PhonemeStat, phoneme_stat_dict
 
 stats_bp = Blueprint('stats', __name__)
 
@@ -49,46 +50,21 @@ def get_user_stats():
         .group_by(UserProgress.flashcard_id) \
         .all()
 
-    grouped_serialized = []
-    for g in grouped:
-        flashcard_id = g.flashcard_id
+    # Per-letter totals of every card, from the aggregate table in one query
+    phoneme_stats = {}
+    for stat in PhonemeStat.query.filter_by(user_id=current_user_id).order_by(PhonemeStat.id):
+        phoneme_stats.setdefault(stat.flashcard_id, []).append(stat.to_dict())
 
-        phoneme_stats = db.session.query(UserProgress.phoneme_details) \
-            .filter_by(user_id=current_user_id, flashcard_id=flashcard_id) \
-            .all()
-
-        # Aggregate phoneme stats
-        phoneme_count = {}
-        for phoneme_entry in phoneme_stats:
-            for phoneme_detail in phoneme_entry.phoneme_details:
-                phoneme = phoneme_detail["phoneme"]
-                if phoneme not in phoneme_count:
-                    phoneme_count[phoneme] = {"correct": 0, "incorrect": 0, "total_similarity": 0, "count": 0}
-
-                phoneme_count[phoneme]["count"] += 1
-                if phoneme_detail["correct"]:
-                    phoneme_count[phoneme]["correct"] += 1
-                else:
-                    phoneme_count[phoneme]["incorrect"] += 1
-
-                phoneme_count[phoneme]["total_similarity"] += phoneme_detail["similarity"]
-
-        grouped_serialized.append({
+    grouped_serialized = [
+        {
             "flashcard_id": g.flashcard_id,
             "attempts": g.attempts,
             "avg_accuracy": round(g.avg_accuracy or 0, 2),
             "avg_pronunciation_score": round(g.avg_pron_score or 0, 2),
-            "phoneme_stats": [
-                {
-                    "phoneme": phoneme,
-                    "correct": phoneme_data["correct"],
-                    "incorrect": phoneme_data["incorrect"],
-                    "avg_similarity": round(phoneme_data["total_similarity"] / phoneme_data["count"], 2) if
-                    phoneme_data["count"] > 0 else 0
-                }
-                for phoneme, phoneme_data in phoneme_count.items()
-            ]
-        })
+            "phoneme_stats": phoneme_stats.get(g.flashcard_id, []),
+        }
+        for g in grouped
+    ]
 
     return jsonify({
         "summary": {
@@ -146,45 +122,33 @@ def get_global_stats():
         func.avg(UserProgress.pronunciation_score).label("avg_pron_score")
     ).group_by(UserProgress.flashcard_id).all()
 
-    grouped_serialized = []
-    for g in grouped:
-        flashcard_id = g.flashcard_id
-
-        phoneme_stats = db.session.query(UserProgress.phoneme_details) \
-            .filter_by(flashcard_id=flashcard_id) \
-            .all()
-
-        phoneme_count = {}
-        for phoneme_entry in phoneme_stats:
-            for phoneme_detail in phoneme_entry.phoneme_details:
-                phoneme = phoneme_detail["phoneme"]
-                if phoneme not in phoneme_count:
-                    phoneme_count[phoneme] = {"correct": 0, "incorrect": 0, "total_similarity": 0, "count": 0}
-
-                phoneme_count[phoneme]["count"] += 1
-                if phoneme_detail["correct"]:
-                    phoneme_count[phoneme]["correct"] += 1
-                else:
-                    phoneme_count[phoneme]["incorrect"] += 1
+    # Summed over users; letters in the order any user first met them
+    totals = db.session.query(
+        PhonemeStat.flashcard_id,
+        PhonemeStat.phoneme,
+        func.sum(PhonemeStat.correct).label("correct"),
+        func.sum(PhonemeStat.incorrect).label("incorrect"),
+        func.sum(PhonemeStat.total_similarity).label("total_similarity"),
+    ).group_by(PhonemeStat.flashcard_id, PhonemeStat.phoneme) \
+        .order_by(func.min(PhonemeStat.id)) \
+        .all()
 
-                phoneme_count[phoneme]["total_similarity"] += phoneme_detail["similarity"]
+    phoneme_stats = {}
+    for t in totals:
+        phoneme_stats.setdefault(t.flashcard_id, []).append(
+            phoneme_stat_dict(t.phoneme, t.correct, t.incorrect, t.total_similarity)
+        )
 
-        grouped_serialized.append({
+    grouped_serialized = [
+        {
             "flashcard_id": g.flashcard_id,
             "attempts": g.attempts,
             "avg_accuracy": round(g.avg_accuracy or 0, 2),
             "avg_pronunciation_score": round(g.avg_pron_score or 0, 2),
-            "phoneme_stats": [
-                {
-                    "phoneme": phoneme,
-                    "correct": phoneme_data["correct"],
-                    "incorrect": phoneme_data["incorrect"],
-                    "avg_similarity": round(phoneme_data["total_similarity"] / phoneme_data["count"], 2) if
-                    phoneme_data["count"] > 0 else 0
-                }
-                for phoneme, phoneme_data in phoneme_count.items()
-            ]
-        })
+            "phoneme_stats": phoneme_stats.get(g.flashcard_id, []),
+        }
+        for g in grouped
+    ]
 
     return jsonify({
         "summary": {
@@ -0,0 +1,221 @@
+"""Similarity-aware alignment of a reference text against a transcription
+
+The analyzer's similar-sounds table is compiled once into a dense
+substitution cost matrix over the Kazakh Cyrillic alphabet. A weighted edit
+distance over that matrix then aligns both texts in one pass, so a near-miss
+like "қ" -> "к" costs less than an unrelated substitution and wins ties
+against it, and the edits come back in reference order.
+
+The DP runs as a numba kernel when numba is installed and as a row-wise
+NumPy recurrence otherwise; both return the same alignment.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba ships with librosa
+    numba = None
+
+KAZAKH_ALPHABET = "аәбвгғдеёжзийкқлмнңоөпрстуұүфхһцчшщъыіьэюя"
+
+EQUAL, REPLACE, DELETE, INSERT = 0, 1, 2, 3
+OPS = ("equal", "replace", "delete", "insert")
+
+# Every Cyrillic code point fits below this; anything else maps to "other"
+_CODE_POINTS = 0x500
+
+
+def _classes(codes, lut, other):
+    classes = np.empty(codes.shape[0], dtype=np.int64)
+    for k in range(codes.shape[0]):
+        classes[k] = lut[codes[k]] if codes[k] < lut.shape[0] else other
+    return classes
+
+
+def _backtrace(D, ref, pred, ref_classes, pred_classes, cost, indel):
+    """Walk D back from the corner; diagonal first, then delete, then insert
+
+    Returns an (edits, 3) array of (op, i, j) rows in reference order.
+    """
+    n, m = ref.shape[0], pred.shape[0]
+    edits = np.empty((n + m, 3), dtype=np.int64)
+    k = n + m
+    i, j = n, m
+    while i > 0 or j > 0:
+        k -= 1
+        if i > 0 and j > 0:
+            equal = ref[i - 1] == pred[j - 1]
+            sub = 0.0 if equal else cost[ref_classes[i - 1], pred_classes[j - 1]]
+            if D[i, j] == D[i - 1, j - 1] + sub:
+                i -= 1
+                j -= 1
+                edits[k, 0] = EQUAL if equal else REPLACE
+                edits[k, 1] = i
+                edits[k, 2] = j
+                continue
+        if i > 0 and D[i, j] == D[i - 1, j] + indel:
+            i -= 1
+            edits[k, 0] = DELETE
+        else:
+            j -= 1
+            edits[k, 0] = INSERT
+        edits[k, 1] = i
+        edits[k, 2] = j
+    return edits[k:]
+
+
+def _align_loops(ref, ref_classes, pred, lut, cost, indel):
+    n, m = ref.shape[0], pred.shape[0]
+    other = cost.shape[0] - 1
+    if ref_classes.shape[0] != n:
+        ref_classes = _classes(ref, lut, other)
+    pred_classes = _classes(pred, lut, other)
+    D = np.empty((n + 1, m + 1), dtype=np.float64)
+    for j in range(m + 1):
+        D[0, j] = j * indel
+    for i in range(1, n + 1):
+        D[i, 0] = i * indel
+        letter = ref[i - 1]
+        row = cost[ref_classes[i - 1]]
+        for j in range(1, m + 1):
+            sub = 0.0 if letter == pred[j - 1] else row[pred_classes[j - 1]]
+            best = D[i - 1, j - 1] + sub
+            if D[i - 1, j] + indel < best:
+                best = D[i - 1, j] + indel
+            if D[i, j - 1] + indel < best:
+                best = D[i, j - 1] + indel
+            D[i, j] = best
+    return _backtrace(D, ref, pred, ref_classes, pred_classes, cost, indel)
+
+
+def _align_numpy(ref, ref_classes, pred, lut, cost, indel):
+    n, m = ref.shape[0], pred.shape[0]
+    other = cost.shape[0] - 1
+    if ref_classes.shape[0] != n:
+        ref_classes = letter_classes(ref, lut, other)
+    pred_classes = letter_classes(pred, lut, other)
+    sub = cost[ref_classes[:, None], pred_classes[None, :]]
+    sub[ref[:, None] == pred[None, :]] = 0.0
+
+    # Within a row, insertions chain left to right: with a uniform cost,
+    # D[i, j] = min over k <= j of (best[k] + (j - k) * indel), a running min
+    steps = np.arange(m + 1) * indel
+    D = np.empty((n + 1, m + 1), dtype=np.float64)
+    D[0] = steps
+    for i in range(1, n + 1):
+        best = np.empty(m + 1)
+        best[0] = i * indel
+        np.minimum(D[i - 1, :-1] + sub[i - 1], D[i - 1, 1:] + indel, out=best[1:])
+        D[i] = np.minimum.accumulate(best - steps) + steps
+    return _backtrace(D, ref, pred, ref_classes, pred_classes, cost, indel)
+
+
+if numba is not None:
+    _classes = numba.njit(cache=True)(_classes)
+    _backtrace = numba.njit(cache=True)(_backtrace)
+    _align_kernel = numba.njit(cache=True)(_align_loops)
+else:
+    _align_kernel = _align_numpy
+
+# Passed as ref_classes when the kernel should derive them itself
+_NO_CLASSES = np.empty(0, dtype=np.int64)
+
+
+def encode_letters(text):
+    """Code points of text as a uint32 array"""
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def alphabet_lut(alphabet=KAZAKH_ALPHABET):
+    """Class id of each code point below 0x500; other letters get len(alphabet)"""
+    lut = np.full(_CODE_POINTS, len(alphabet), dtype=np.int64)
+    for index, letter in enumerate(alphabet):
+        lut[ord(letter)] = index
+    return lut
+
+
+def letter_classes(codes, lut, other):
+    """Similarity-class id of each code point, as the cost matrix indexes them"""
+    return np.where(
+        codes < lut.shape[0], lut[np.minimum(codes, lut.shape[0] - 1)], other
+    )
+
+
+class PhonemeAligner:
+    """Weighted edit-distance aligner compiled from a similar-sounds table
+
+    similar_phonemes maps a reference letter to the letters it is commonly
+    heard as. Those substitutions cost similar_cost, other substitutions
+    cost 1 and insertions/deletions cost indel_cost. Letters outside the
+    alphabet share one "other" row and column, so they only match exactly.
+    """
+
+    def __init__(
+        self,
+        similar_phonemes,
+        alphabet=KAZAKH_ALPHABET,
+        similar_cost=0.5,
+        indel_cost=1.0,
+    ):
+        self.alphabet = alphabet
+        self.indel_cost = float(indel_cost)
+
+        self.lut = alphabet_lut(alphabet)
+
+        size = len(alphabet) + 1
+        self.similarity = np.eye(size)
+        self.similarity[-1, -1] = 0.0  # two different "other" letters
+        for reference, similar in similar_phonemes.items():
+            for predicted in similar:
+                self.similarity[self._index(reference), self._index(predicted)] = (
+                    1 - similar_cost
+                )
+        self.cost = 1.0 - self.similarity
+        self._similar_pairs = {
+            (reference, predicted): 1 - similar_cost
+            for reference, similar in similar_phonemes.items()
+            for predicted in similar
+        }
+
+    def _index(self, letter):
+        code = ord(letter)
+        return int(self.lut[code]) if code < _CODE_POINTS else len(self.alphabet)
+
+    def similarity_of(self, reference_letter, predicted_letter):
+        """1.0 for a match, 1 - similar_cost for a listed near-miss, else 0.0"""
+        if reference_letter == predicted_letter:
+            return 1.0
+        return self._similar_pairs.get((reference_letter, predicted_letter), 0.0)
+
+    def classes(self, codes):
+        """Similarity-class ids for encode_letters() output, for align_encoded"""
+        return letter_classes(codes, self.lut, len(self.alphabet))
+
+    def align(self, reference, predicted):
+        """Ordered edits turning reference into predicted
+
+        Returns [op, i, j] rows covering every reference letter in order,
+        where op indexes OPS (EQUAL, REPLACE, DELETE, INSERT). For INSERT,
+        i is the reference position the extra letter precedes.
+        """
+        # Both texts as one UTF-32 buffer: one encode per call
+        codes = encode_letters(reference + predicted)
+        n = len(reference)
+        return _align_kernel(
+            codes[:n], _NO_CLASSES, codes[n:], self.lut, self.cost, self.indel_cost
+        ).tolist()
+
+    def align_encoded(self, reference_codes, reference_classes, predicted):
+        """align() for a reference already encoded, e.g. a flashcard's stored data
+
+        reference_classes must be int64, as classes() returns them.
+        """
+        return _align_kernel(
+            reference_codes,
+            reference_classes,
+            encode_letters(predicted),
+            self.lut,
+            self.cost,
+            self.indel_cost,
+        ).tolist()
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import numpy as np
+
+from app.utils.asr_client import ASRClient, ASRUnavailableError
+from app.utils.audio_io import encode_wav
+
+ASR_BACKENDS = ("remote", "local", "hybrid")
+
+
+class ASRBackend:
+    """Turns a 16 kHz mono waveform into text
+
+    audio_bytes may carry an already-encoded WAV of the same waveform so
+    backends that upload it do not have to encode it again.
+    """
+
+    name = None
+
+    def transcribe(self, waveform, sample_rate, audio_bytes=None):
+        raise NotImplementedError
+
+    def warmup(self):
+        """Pay one-off costs (weights, kernels) before the first request"""
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+class RemoteASRBackend(ASRBackend):
+    """The wav2vec2 service behind ASR_URL, through the pooled client"""
+
+    name = "remote"
+
+    def __init__(self, client):
+        self.client = client
+
+    def transcribe(self, waveform, sample_rate, audio_bytes=None):
+        if audio_bytes is None:
+            audio_bytes = encode_wav(waveform, sample_rate)
+        return self.client.transcribe(audio_bytes)
+
+    def stats(self):
+        return {"backend": self.name, **self.client.stats()}
+
+
+class LocalASRBackend(ASRBackend):
+    """wav2vec2 CTC in this process; no network hop, but the worker holds the weights"""
+
+    name = "local"
+
+    def __init__(self, model_name, num_threads=None):
+        import torch
+        from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self._torch = torch
+        self.model_name = model_name
+        self.processor = Wav2Vec2Processor.from_pretrained(model_name)
+        self.model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+        self.calls = 0
+
+    def transcribe(self, waveform, sample_rate, audio_bytes=None):
+        inputs = self.processor(waveform, sampling_rate=sample_rate, return_tensors="pt")
+        with self._torch.inference_mode():
+            logits = self.model(inputs.input_values).logits
+        self.calls += 1
+        predicted_ids = self._torch.argmax(logits, dim=-1)
+        return self.processor.batch_decode(predicted_ids)[0]
+
+    def warmup(self):
+        self.transcribe(np.zeros(16000, dtype=np.float32), 16000)
+        self.calls -= 1
+
+    def stats(self):
+        return {"backend": self.name, "model": self.model_name, "calls": self.calls}
+
+
+class HybridASRBackend(ASRBackend):
+    """Send each clip to whichever backend has been faster for clips of its length
+
+    Latency is tracked as an EWMA per backend and clip-duration bucket.
+    Until both backends have been measured for a bucket, clips up to
+    local_max_seconds stay local and longer ones go remote; after that one
+    clip in explore_every goes to the slower side to keep its estimate
+    fresh. Clips fall back to the local model while the remote is down.
+    """
+
+    name = "hybrid"
+    BUCKET_EDGES = (1.0, 2.0, 4.0, 8.0, float("inf"))
+
+    def __init__(self, local, remote, local_max_seconds=3.0, alpha=0.2, explore_every=20):
+        self.local = local
+        self.remote = remote
+        self.local_max_seconds = local_max_seconds
+        self.alpha = alpha
+        self.explore_every = explore_every
+        self.latency = {}
+        self.routed = {"local": 0, "remote": 0, "fallback": 0}
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, duration):
+        return next(i for i, edge in enumerate(self.BUCKET_EDGES) if duration <= edge)
+
+    def _route(self, duration):
+        bucket = self._bucket(duration)
+        with self._lock:
+            self._requests += 1
+            local = self.latency.get(("local", bucket))
+            remote = self.latency.get(("remote", bucket))
+            if local is None or remote is None:
+                # Measure whichever side has no estimate yet, else use the static split
+                if local is None and remote is not None:
+                    return "local"
+                if remote is None and local is not None:
+                    return "remote"
+                return "local" if duration <= self.local_max_seconds else "remote"
+            faster, slower = ("local", "remote") if local <= remote else ("remote", "local")
+            return slower if self._requests % self.explore_every == 0 else faster
+
+    def _observe(self, choice, duration, seconds):
+        key = (choice, self._bucket(duration))
+        with self._lock:
+            previous = self.latency.get(key)
+            self.latency[key] = (
+                seconds if previous is None else previous + self.alpha * (seconds - previous)
+            )
+            self.routed[choice] += 1
+
+    def transcribe(self, waveform, sample_rate, audio_bytes=None):
+        duration = len(waveform) / sample_rate
+        choice = self._route(duration)
+        backend = self.local if choice == "local" else self.remote
+
+        start = time.perf_counter()
+        try:
+            text = backend.transcribe(waveform, sample_rate, audio_bytes)
+        except ASRUnavailableError:
+            if choice == "local":
+                raise
+            with self._lock:
+                self.routed["fallback"] += 1
+            return self.local.transcribe(waveform, sample_rate)
+        self._observe(choice, duration, time.perf_counter() - start)
+        return text
+
+    def warmup(self):
+        self.local.warmup()
+
+    def stats(self):
+        with self._lock:
+            latency = {
+                f"{backend}<={self.BUCKET_EDGES[bucket]:g}s": round(seconds * 1000, 1)
+                for (backend, bucket), seconds in sorted(self.latency.items())
+            }
+            routed = dict(self.routed)
+        return {
+            "backend": self.name,
+            "routed": routed,
+            "latency_ms": latency,
+            "local": self.local.stats(),
+            "remote": self.remote.stats(),
+        }
+
+
+def create_asr_backend(config):
+    """Build the backend named by ASR_BACKEND from the Flask config"""
+    kind = config["ASR_BACKEND"]
+    if kind not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR_BACKEND '{kind}', expected one of {', '.join(ASR_BACKENDS)}")
+
+    def remote():
+        return RemoteASRBackend(ASRClient(
+            url=config["ASR_URL"],
+            connect_timeout=config["ASR_CONNECT_TIMEOUT"],
+            read_timeout=config["ASR_READ_TIMEOUT"],
+            retries=config["ASR_RETRIES"],
+            backoff=config["ASR_RETRY_BACKOFF"],
+            pool_size=config["ASR_POOL_SIZE"],
+            failure_threshold=config["ASR_BREAKER_THRESHOLD"],
+            reset_timeout=config["ASR_BREAKER_RESET"],
+        ))
+
+    def local():
+        return LocalASRBackend(config["ASR_MODEL_NAME"], config["ASR_LOCAL_THREADS"])
+
+    if kind == "remote":
+        return remote()
+    if kind == "local":
+        return local()
+    return HybridASRBackend(local(), remote(), local_max_seconds=config["ASR_HYBRID_LOCAL_MAX_SECONDS"])
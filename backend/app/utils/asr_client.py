@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ASRUnavailableError(RuntimeError):
+    """The ASR service could not be reached or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, then let one trial call through
+
+    closed: calls pass; failure_threshold consecutive failures open it.
+    open: calls are rejected until reset_timeout seconds have passed.
+    half_open: a single trial call decides between closed and open again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ASRClient:
+    """Keep-alive client for the remote /transcribe endpoint
+
+    One requests.Session with a bounded connection pool is shared by every
+    request thread, so uploads reuse warm TCP connections. Connection errors
+    and 502/503/504 answers are retried with jittered exponential backoff;
+    read timeouts are not, since the box already has the audio and a second
+    upload would only add to its queue.
+    """
+
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(
+        self,
+        url,
+        connect_timeout=3.05,
+        read_timeout=30.0,
+        retries=2,
+        backoff=0.2,
+        pool_size=10,
+        failure_threshold=5,
+        reset_timeout=30.0,
+    ):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _sleep_before_retry(self, attempt):
+        # Full jitter: concurrent workers retrying a flapping box spread out
+        time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def transcribe(self, audio_bytes, filename="audio.wav"):
+        """Upload WAV bytes and return the transcription text"""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise ASRUnavailableError("ASR service is unavailable, try again shortly")
+
+        self._count("calls")
+        files = {"audio": (filename, audio_bytes, "audio/wav")}
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, files=files, timeout=self.timeout)
+            except requests.exceptions.ReadTimeout as e:
+                self._fail()
+                raise ASRUnavailableError(f"ASR service timed out: {e}") from e
+            except requests.exceptions.ConnectionError as e:
+                if attempt < self.retries:
+                    self._count("retried")
+                    self._sleep_before_retry(attempt)
+                    continue
+                self._fail()
+                raise ASRUnavailableError(f"ASR service is unreachable: {e}") from e
+            except requests.exceptions.RequestException as e:
+                # Broken or undecodable responses; failing also frees a half-open trial
+                self._fail()
+                raise ASRUnavailableError(f"ASR request failed: {e}") from e
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.retries:
+                self._count("retried")
+                self._sleep_before_retry(attempt)
+                continue
+
+            if response.status_code >= 500:
+                self._fail()
+                raise ASRUnavailableError(f"ASR service returned {response.status_code}")
+
+            # A 4xx is about this upload, not the service's health
+            self.breaker.record_success()
+            if response.status_code != 200:
+                raise RuntimeError("ASR service failed to process the audio")
+            return response.json()["transcription"]
+
+    def _fail(self):
+        self._count("failed")
+        self.breaker.record_failure()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "url": self.url,
+                "calls": self.calls,
+                "retried": self.retried,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "circuit": self.breaker.state,
+            }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,187 @@
+import io
+import shutil
+import struct
+import subprocess
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Leading bytes of each container we accept; libsndfile reads all but WebM
+CONTAINER_SIGNATURES = (
+    (b"RIFF", "wav"),
+    (b"fLaC", "flac"),
+    (b"OggS", "ogg"),
+    (b"\x1a\x45\xdf\xa3", "webm"),
+)
+
+
+class AudioDecodeError(ValueError):
+    """The upload is not audio we can decode, or breaks the size/duration limits"""
+
+
+def sniff_container(data):
+    """'wav', 'flac', 'ogg' (Vorbis or Opus), 'webm' or None, from the magic bytes"""
+    for signature, container in CONTAINER_SIGNATURES:
+        if data.startswith(signature):
+            return container
+    return None
+
+
+def read_upload(audio_file):
+    """Read an uploaded FileStorage into memory without touching the disk"""
+    audio_file.stream.seek(0)
+    return audio_file.stream.read()
+
+
+def pcm16_view(data, target_sample_rate=16000):
+    """Zero-copy int16 view of a 16-bit PCM mono WAV already at the target rate
+
+    Walks the RIFF chunks instead of going through libsndfile; returns None
+    for anything else (other rates, channels, encodings, containers) so the
+    caller falls back to a full decode.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", data, body)
+            if fmt[0] == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # The real format tag is the first two bytes of the SubFormat GUID
+                (sub_format,) = struct.unpack_from("<H", data, body + 24)
+                fmt = (sub_format,) + fmt[1:]
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            format_tag, channels, sample_rate, _, _, bits = fmt
+            if (format_tag, channels, sample_rate, bits) != (
+                WAVE_FORMAT_PCM,
+                1,
+                target_sample_rate,
+                16,
+            ):
+                return None
+            # Browsers streaming a recording may leave the size unset or too big
+            count = min(chunk_size, len(data) - body) // 2
+            return np.frombuffer(data, dtype="<i2", count=count, offset=body)
+        # Chunks are word aligned
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def decode_ffmpeg(data, target_sample_rate=16000, max_duration=None, timeout=30):
+    """Decode any container ffmpeg understands (WebM/Opus from MediaRecorder)
+
+    The upload is piped through ffmpeg, which downmixes and resamples on the
+    way out, so the result is already a mono float32 buffer at the target rate.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise AudioDecodeError("This audio format needs ffmpeg, which is not installed")
+
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0"]
+    if max_duration:
+        # Decode just past the limit so an over-long upload is still detected
+        command += ["-t", str(max_duration + 1)]
+    command += ["-f", "f32le", "-ac", "1", "-ar", str(target_sample_rate), "pipe:1"]
+    try:
+        result = subprocess.run(
+            command, input=data, capture_output=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError("Decoding the audio took too long")
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise AudioDecodeError(
+            f"Could not decode audio: {message[-1] if message else 'ffmpeg failed'}"
+        )
+    return np.frombuffer(result.stdout, dtype="<f4").astype(np.float32, copy=False)
+
+
+def check_duration(duration, max_duration):
+    if max_duration and duration > max_duration:
+        raise AudioDecodeError(
+            f"Recording is {duration:.1f} s long; the limit is {max_duration:g} s"
+        )
+
+
+def decode_audio(
+    data, target_sample_rate=16000, resample_quality="HQ", max_duration=None
+):
+    """Decode in-memory audio bytes into a mono float32 waveform
+
+    16 kHz mono 16-bit WAV, what most browser recorders send, is read
+    straight out of the upload buffer. WAV, FLAC and Ogg (Vorbis/Opus) are
+    decoded with soundfile (BytesIO shares the buffer instead of copying
+    it) and, when the rate differs, resampled with soxr at resample_quality
+    ("VHQ", "HQ", "MQ", "LQ" or "QQ"; "HQ" matches librosa's default).
+    WebM, and anything else libsndfile cannot read, goes through ffmpeg
+    when it is installed. Uploads longer than max_duration seconds are
+    rejected from the header, before the samples are decoded.
+    """
+    pcm = pcm16_view(data, target_sample_rate)
+    if pcm is not None:
+        check_duration(len(pcm) / target_sample_rate, max_duration)
+        # Same scaling libsndfile applies when reading PCM_16 as float
+        waveform = pcm.astype(np.float32)
+        waveform *= 1.0 / 32768.0
+        return waveform, target_sample_rate
+
+    if sniff_container(data) == "webm":
+        waveform = decode_ffmpeg(data, target_sample_rate, max_duration)
+        check_duration(len(waveform) / target_sample_rate, max_duration)
+        return waveform, target_sample_rate
+
+    try:
+        with sf.SoundFile(io.BytesIO(data)) as f:
+            sample_rate = f.samplerate
+            check_duration(f.frames / sample_rate, max_duration)
+            waveform = f.read(dtype="float32", always_2d=True)
+    except sf.LibsndfileError as e:
+        if shutil.which("ffmpeg") is None:
+            raise AudioDecodeError(f"Could not decode audio: {e.error_string}") from e
+        # Anything else librosa used to reach through audioread (MP4/AAC from
+        # Safari, mislabelled uploads) goes through ffmpeg too
+        waveform = decode_ffmpeg(data, target_sample_rate, max_duration)
+        check_duration(len(waveform) / target_sample_rate, max_duration)
+        return waveform, target_sample_rate
+
+    # Downmix to mono the same way librosa.load does
+    if waveform.shape[1] > 1:
+        waveform = waveform.mean(axis=1)
+    else:
+        waveform = waveform[:, 0]
+
+    if sample_rate != target_sample_rate:
+        resampled = soxr.resample(
+            waveform, sample_rate, target_sample_rate, quality=resample_quality
+        )
+        # Same output length as librosa.resample, so frame counts do not shift
+        length = -(-len(waveform) * target_sample_rate // sample_rate)
+        waveform = np.pad(resampled[:length], (0, max(0, length - len(resampled))))
+
+    return np.ascontiguousarray(waveform, dtype=np.float32), target_sample_rate
+
+
+def load_upload(
+    audio_file, target_sample_rate=16000, resample_quality="HQ", max_duration=None
+):
+    """Decode an uploaded FileStorage straight to a 16 kHz float32 buffer"""
+    return decode_audio(
+        read_upload(audio_file), target_sample_rate, resample_quality, max_duration
+    )
+
+
+def encode_wav(waveform, sample_rate=16000):
+    """Encode a float waveform as 16-bit PCM WAV bytes"""
+    buffer = io.BytesIO()
+    sf.write(buffer, waveform, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
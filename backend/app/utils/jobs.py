@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(RuntimeError):
+    """Too many analysis jobs are already waiting; the client should retry later"""
+
+
+class Job:
+    def __init__(self, owner):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.status_code = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._changed = threading.Condition()
+        self.version = 0
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, seen_version, timeout):
+        """Block until the job changes after seen_version; returns the new version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen_version, timeout)
+            return self.version
+
+    def to_dict(self):
+        data = {"job_id": self.id, "status": self.status}
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "failed":
+            data["error"] = self.error
+            data["status_code"] = self.status_code
+        return data
+
+
+class JobQueue:
+    """Background analysis jobs on a local thread pool, with a bounded backlog
+
+    Jobs and their results live in this process only, so with several
+    server processes a client has to poll the one that accepted its job.
+    Finished jobs are dropped ttl seconds after they complete.
+    """
+
+    def __init__(self, app, max_workers=2, max_queued=32, ttl=600):
+        self.app = app
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyze-job")
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, owner, fn, *args):
+        """Queue fn(*args) inside an app context; raises QueueFullError when full"""
+        with self._lock:
+            self._expire()
+            if self._pending >= self.max_queued:
+                raise QueueFullError("Too many analyses in progress, try again shortly")
+            job = Job(owner)
+            self._jobs[job.id] = job
+            self._pending += 1
+
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id, owner):
+        """The job if it exists and belongs to owner, else None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            pending = self._pending
+        return {
+            "pending": pending,
+            "max_queued": self.max_queued,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "failed": statuses.count("failed"),
+        }
+
+    def _run(self, job, fn, args):
+        from app import db
+        from app.utils.asr_client import ASRUnavailableError
+
+        job._update(status="running")
+        try:
+            with self.app.app_context():
+                try:
+                    result = fn(*args)
+                except Exception:
+                    db.session.rollback()
+                    raise
+            job._update(status="done", result=result, finished_at=time.time())
+        except ValueError as e:
+            job._update(status="failed", error=str(e), status_code=400, finished_at=time.time())
+        except ASRUnavailableError as e:
+            job._update(status="failed", error=str(e), status_code=503, finished_at=time.time())
+        except Exception as e:
+            job._update(status="failed", error=str(e), status_code=500, finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,120 @@
+"""Packed binary form of UserProgress.phoneme_details
+
+A stored attempt is one version byte followed by fixed-size records:
+
+    phoneme     uint32  code point of the reference letter ("∅" for extras)
+    heard       uint32  code point of what was heard instead, 0 if nothing
+    status      uint8   CORRECT, MISPRONOUNCED, OMITTED or EXTRA
+    similarity  uint8   similarity * SIMILARITY_SCALE, rounded
+
+That is 10 bytes per letter instead of the ~80 the JSON dicts take, and
+stats can aggregate the records with NumPy without parsing anything. The
+dicts the analyzer produces, "similar_to" lists included, are rebuilt by
+decode_phoneme_details only where an API answer needs them.
+"""
+import numpy as np
+
+from app.utils.pronunciation_analysis import SIMILAR_PHONEMES
+
+FORMAT_VERSION = 1
+
+CORRECT, MISPRONOUNCED, OMITTED, EXTRA = 0, 1, 2, 3
+
+# 0.5 is stored exactly; other similarities round to the nearest 0.005
+SIMILARITY_SCALE = 200
+
+RECORD = np.dtype([("phoneme", "<u4"), ("heard", "<u4"), ("status", "u1"), ("similarity", "u1")])
+
+
+def _status(detail):
+    if detail["correct"]:
+        return CORRECT
+    if "predicted_as" in detail:
+        return MISPRONOUNCED
+    if "extra" in detail:
+        return EXTRA
+    return OMITTED
+
+
+def encode_phoneme_details(details):
+    """Pack the analyzer's phoneme_details list into bytes"""
+    records = []
+    for detail in details:
+        heard = detail.get("predicted_as") or detail.get("extra") or ""
+        if len(detail["phoneme"]) != 1 or len(heard) > 1:
+            raise ValueError(f"Cannot pack phoneme detail {detail!r}: expected single letters")
+        records.append((
+            ord(detail["phoneme"]),
+            ord(heard) if heard else 0,
+            _status(detail),
+            round(detail["similarity"] * SIMILARITY_SCALE),
+        ))
+    return bytes([FORMAT_VERSION]) + np.array(records, dtype=RECORD).tobytes()
+
+
+def unpack_records(packed):
+    """The records of one packed value as a NumPy structured array"""
+    if not packed:
+        return np.empty(0, dtype=RECORD)
+    if packed[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown phoneme_details format version {packed[0]}")
+    return np.frombuffer(packed, dtype=RECORD, offset=1)
+
+
+def decode_phoneme_details(packed, similar_phonemes=SIMILAR_PHONEMES):
+    """Expand packed bytes back into the analyzer's phoneme_details list"""
+    details = []
+    for phoneme, heard, status, similarity in unpack_records(packed).tolist():
+        phoneme = chr(phoneme)
+        if status == CORRECT:
+            details.append({"phoneme": phoneme, "correct": True, "similarity": 1.0, "similar_to": []})
+        elif status == MISPRONOUNCED:
+            details.append({
+                "error": "mispronounciation",
+                "phoneme": phoneme,
+                "correct": False,
+                "similarity": similarity / SIMILARITY_SCALE,
+                "predicted_as": chr(heard),
+                "similar_to": list(similar_phonemes.get(phoneme, [])),
+            })
+        elif status == OMITTED:
+            details.append({"error": "omitted", "phoneme": phoneme, "correct": False, "similarity": 0.0})
+        else:
+            details.append({
+                "error": "extra sound",
+                "phoneme": phoneme,
+                "correct": False,
+                "similarity": 0.0,
+                "extra": chr(heard),
+            })
+    return details
+
+
+def phoneme_totals(packed_values):
+    """Per-letter correct/incorrect counts and similarity sums over many attempts
+
+    Returns {phoneme: {"correct", "incorrect", "total_similarity", "count"}}
+    in order of first appearance, the shape the stats routes aggregate into.
+    """
+    packed_values = [packed for packed in packed_values if packed]
+    if any(packed[0] != FORMAT_VERSION for packed in packed_values):
+        raise ValueError("Unknown phoneme_details format version")
+    # Records are fixed-size, so all rows parse as one array
+    records = np.frombuffer(b"".join([packed[1:] for packed in packed_values]), dtype=RECORD)
+    if not len(records):
+        return {}
+
+    letters, first, inverse = np.unique(records["phoneme"], return_index=True, return_inverse=True)
+    count = np.bincount(inverse, minlength=len(letters))
+    correct = np.bincount(inverse, weights=records["status"] == CORRECT, minlength=len(letters))
+    similarity = np.bincount(inverse, weights=records["similarity"], minlength=len(letters))
+
+    totals = {}
+    for k in np.argsort(first, kind="stable").tolist():
+        totals[chr(letters[k])] = {
+            "correct": int(correct[k]),
+            "incorrect": int(count[k] - correct[k]),
+            "total_similarity": float(similarity[k]) / SIMILARITY_SCALE,
+            "count": int(count[k]),
+        }
+    return totals
@@ -0,0 +1,54 @@
+"""Grapheme -> IPA for Kazakh Cyrillic, shared by every phoneme report
+
+Read-only, so no caller can change the map under the others.
+"""
+
+from types import MappingProxyType
+
+PHONEME_MAP = MappingProxyType(
+    {
+        # Kazakh-specific phonemes
+        "ә": "æ",  # Front open unrounded vowel
+        "і": "ɪ",  # Near-close front unrounded vowel
+        "ң": "ŋ",  # Velar nasal
+        "ғ": "ɣ",  # Voiced velar fricative
+        "ү": "y",  # Close front rounded vowel
+        "ұ": "ʊ",  # Near-close back rounded vowel
+        "қ": "q",  # Voiceless uvular stop
+        "ө": "ø",  # Close-mid front rounded vowel
+        "һ": "h",  # Voiceless glottal fricative
+        # Russian Cyrillic phonemes
+        "а": "ɑ",  # Open back unrounded vowel
+        "б": "b",  # Voiced bilabial plosive
+        "в": "v",  # Voiced labiodental fricative
+        "г": "ɡ",  # Voiced velar plosive
+        "д": "d",  # Voiced alveolar plosive
+        "е": "jɛ",  # Yotated open-mid front unrounded vowel
+        "ж": "ʒ",  # Voiced postalveolar fricative
+        "з": "z",  # Voiced alveolar fricative
+        "и": "i",  # Close front unrounded vowel
+        "й": "j",  # Palatal approximant
+        "к": "k",  # Voiceless velar plosive
+        "л": "l",  # Alveolar lateral approximant
+        "м": "m",  # Bilabial nasal
+        "н": "n",  # Alveolar nasal
+        "о": "ɔ",  # Open-mid back rounded vowel
+        "п": "p",  # Voiceless bilabial plosive
+        "р": "r",  # Alveolar trill
+        "с": "s",  # Voiceless alveolar fricative
+        "т": "t",  # Voiceless alveolar plosive
+        "у": "u",  # Close back rounded vowel
+        "ф": "f",  # Voiceless labiodental fricative
+        "х": "x",  # Voiceless velar fricative
+        "ц": "ts",  # Voiceless alveolar affricate
+        "ч": "tʃ",  # Voiceless postalveolar affricate
+        "ш": "ʃ",  # Voiceless postalveolar fricative
+        "щ": "ʃtɕ",  # Voiceless postalveolar-palatal affricate
+        "ъ": "",  # Hard sign (modifier)
+        "ы": "ɨ",  # Close central unrounded vowel
+        "ь": "",  # Soft sign (modifier)
+        "э": "ɛ",  # Open-mid front unrounded vowel
+        "ю": "ju",  # Yotated close back rounded vowel
+        "я": "jɑ",  # Yotated open back unrounded vowel
+    }
+)
@@ -0,0 +1,57 @@
+from app import db
+from app.models.user_flashcards import UserFlashcard
+from app.models.user_progress import UserProgress
+from app.models.phoneme_stats import PhonemeStat
+from app.utils.phoneme_codec import phoneme_totals
+from app.utils.timing import span
+
+
+def record_attempt(user_id, flashcard_id, result):
+    """Persist one analysed attempt and run the SM-2 review, in one commit"""
+    if "phoneme_analysis" not in result:
+        raise ValueError(f"Missing 'phoneme_analysis' in analysis result: {result}")
+
+    accuracy = result["phoneme_analysis"].get("accuracy")
+    if accuracy is None:
+        raise ValueError(f"Missing 'accuracy' in phoneme_analysis result: {result}")
+
+    # Get or create UserFlashcard
+    user_flashcard = UserFlashcard.query.filter_by(
+        user_id=user_id,
+        flashcard_id=flashcard_id
+    ).first()
+
+    if not user_flashcard:
+        user_flashcard = UserFlashcard(
+            user_id=user_id,
+            flashcard_id=flashcard_id
+        )
+        db.session.add(user_flashcard)
+
+    # Save UserProgress
+    user_progress = UserProgress(
+        user_id=user_id,
+        flashcard_id=flashcard_id,
+        accuracy=accuracy,
+        correct_phonemes=result["phoneme_analysis"]["correct_phonemes"],
+        total_phonemes=result["phoneme_analysis"]["total_phonemes"],
+        phoneme_details=result["phoneme_analysis"]["phoneme_details"],
+        predicted_text=result["predicted_text"],
+        pronunciation_score=result["pronunciation_score"],
+        reference_text=result["reference_text"],
+        rhythm_regularity=result["rhythm_metrics"]["rhythm_regularity"],
+        speech_rate=result["rhythm_metrics"]["speech_rate"]
+    )
+    db.session.add(user_progress)
+
+    # Per-letter stats, from the packed details so they round like stored rows
+    PhonemeStat.add_totals(
+        user_id, flashcard_id, phoneme_totals([user_progress.phoneme_details_packed])
+    )
+
+    # Update SM-2 logic and commit everything
+    with span("db"):
+        user_flashcard.review(accuracy)
+        db.session.commit()
+
+    return user_progress
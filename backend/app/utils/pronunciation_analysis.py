@@ -1,26 +1,40 @@
+import copy
+
 import numpy as np
-from scipy.signal import hilbert, find_peaks
-import Levenshtein
+
+from app.utils.alignment import DELETE, EQUAL, REPLACE, PhonemeAligner
+from app.utils.rhythm import batch_rhythm_metrics, rhythm_metrics
+from app.utils.timing import span
+
+
+# Letters learners commonly produce instead of the reference letter
+SIMILAR_PHONEMES = {
+    "қ": ["к", "х"],  # Similar sounds to қ
+    "ғ": ["г"],  # Similar sounds to ғ
+    "ң": ["н", "м"],  # Similar sounds to ң
+    "ә": ["а", "е"],  # Similar sounds to ә
+    "ө": ["о", "ұ"],  # Similar sounds to ө
+    "ү": ["у", "ұ"],  # Similar sounds to ү
+    "һ": ["х"],  # Similar sounds to һ
+    "і": ["ы", "и"],  # Similar sounds to і
+    "ы": ["і", "и"],  # Similar sounds to ы
+    "и": ["і", "ы"],  # Similar sounds to и
+}
 
 
 class PronunciationAnalyzer:
     def __init__(self):
-        self.similar_phonemes = {
-            "қ": ["к", "х"],  # Similar sounds to қ
-            "ғ": ["г"],  # Similar sounds to ғ
-            "ң": ["н", "м"],  # Similar sounds to ң
-            "ә": ["а", "е"],  # Similar sounds to ә
-            "ө": ["о", "ұ"],  # Similar sounds to ө
-            "ү": ["у", "ұ"],  # Similar sounds to ү
-            "һ": ["х"],  # Similar sounds to һ
-            "і": ["ы", "и"],  # Similar sounds to і
-            "ы": ["і", "и"],  # Similar sounds to ы
-            "и": ["і", "ы"],  # Similar sounds to и
-        }
+        self.similar_phonemes = SIMILAR_PHONEMES
+        self.aligner = PhonemeAligner(self.similar_phonemes)
 
     def _get_default_analysis(self):
-        """Provide default values when analysis fails"""
+        """Provide default values when analysis fails
+
+        "failed" marks the placeholder so callers do not cache or store it
+        as a real result; the response builders leave it out.
+        """
         return {
+            "failed": True,
             "pronunciation_score": 0.0,
             "confidence": 0.0,
             "phoneme_analysis": {
@@ -40,26 +54,27 @@ class PronunciationAnalyzer:
 
     def _calculate_phoneme_similarity(self, reference_phoneme, predicted_phoneme):
         """Calculate similarity between two phonemes"""
-        if reference_phoneme == predicted_phoneme:
-            return 1.0
-        elif (
-            reference_phoneme in self.similar_phonemes
-            and predicted_phoneme in self.similar_phonemes[reference_phoneme]
-        ):
-            return 0.5
-        return 0.0
+        return self.aligner.similarity_of(reference_phoneme, predicted_phoneme)
 
     def analyze_pronunciation(
-        self, waveform, sample_rate, reference_text, predicted_text
+        self, waveform, sample_rate, reference_text, predicted_text, reference=None
     ):
-        """Enhanced pronunciation analysis"""
+        """Enhanced pronunciation analysis
+
+        reference is the flashcard's precomputed ReferencePhonemes for
+        reference_text, if it has one.
+        """
         try:
 
             # Calculate detailed phoneme analysis
-            phoneme_analysis = self._analyze_phonemes(reference_text, predicted_text)
+            with span("phonemes"):
+                phoneme_analysis = self._analyze_phonemes(
+                    reference_text, predicted_text, reference
+                )
 
             # Get rhythm and timing metrics
-            rhythm_metrics = self.calculate_rhythm_metrics(waveform, sample_rate)
+            with span("rhythm"):
+                rhythm_metrics = self.calculate_rhythm_metrics(waveform, sample_rate)
 
             # Calculate overall score with new weighting
             overall_score = self._calculate_overall_score(
@@ -67,13 +82,16 @@ class PronunciationAnalyzer:
                 rhythm_metrics["rhythm_regularity"],
             )
 
+            with span("feedback"):
+                detailed_feedback = self._generate_feedback(
+                    overall_score, phoneme_analysis, rhythm_metrics
+                )
+
             return {
                 "pronunciation_score": overall_score,
                 "phoneme_analysis": phoneme_analysis,
                 "rhythm_metrics": rhythm_metrics,
-                "detailed_feedback": self._generate_feedback(
-                    overall_score, phoneme_analysis, rhythm_metrics
-                ),
+                "detailed_feedback": detailed_feedback,
             }
         except Exception as e:
             print(f"Error in analyze_pronunciation: {str(e)}")
@@ -82,25 +100,19 @@ class PronunciationAnalyzer:
     def calculate_rhythm_metrics(self, waveform, sample_rate):
         """Calculate rhythm-related metrics"""
         try:
-            analytic_signal = hilbert(waveform)
-            envelope = np.abs(analytic_signal)
-            peaks, _ = find_peaks(envelope, distance=int(sample_rate * 0.1))
-
-            speech_rate = len(peaks) / (len(waveform) / sample_rate)
-
-            if len(peaks) > 1:
-                peak_intervals = np.diff(peaks)
-                rhythm_regularity = np.std(peak_intervals) / np.mean(peak_intervals)
-            else:
-                rhythm_regularity = 0.5
-
-            return {"speech_rate": speech_rate, "rhythm_regularity": rhythm_regularity}
+            # Same peaks as find_peaks on |hilbert(waveform)|, from real FFTs
+            return rhythm_metrics(waveform, sample_rate)
         except Exception as e:
             print(f"Error in calculate_rhythm_metrics: {str(e)}")
             return {"speech_rate": 0.0, "rhythm_regularity": 1.0}
 
-    def _analyze_phonemes(self, reference_text, predicted_text):
-        """Enhanced phoneme analysis"""
+    def _analyze_phonemes(self, reference_text, predicted_text, reference=None):
+        """Enhanced phoneme analysis
+
+        Details follow the reference text, with extra sounds at the place
+        they were inserted. With reference, the stored letter codes and
+        similarity classes are aligned instead of encoding the text again.
+        """
         analysis = {
             "total_phonemes": len(reference_text),
             "correct_phonemes": 0,
@@ -108,17 +120,10 @@ class PronunciationAnalyzer:
         }
 
         # Normalize texts
-        ref_text = reference_text.lower()
+        ref_text = reference.text if reference is not None else reference_text.lower()
         pred_text = predicted_text.lower()
 
-        # Calculate Levenshtein matrix for alignment
-        matrix = Levenshtein.editops(ref_text, pred_text)
-
-        # Analyze each phoneme
-        i = 0  # reference text index
-        j = 0  # predicted text index
-
-        if not matrix:  # Texts are identical
+        if ref_text == pred_text:  # Texts are identical
             for phoneme in ref_text:
                 analysis["correct_phonemes"] += 1
                 analysis["phoneme_details"].append(
@@ -131,78 +136,69 @@ class PronunciationAnalyzer:
                 )
             analysis["accuracy"] = 100.0
             return analysis
-        
-        # print(matrix)
-        source_modified = set()
-        dest_modified = set()
-
-        analysis['correct_phonemes'] = len(ref_text) - len(matrix)
-        for op, i, j in matrix:
-            if op == "replace":
-                source_modified.add(i)
-                dest_modified.add(j)
+
+        # Similarity-weighted alignment, so near-misses line up as substitutions
+        if reference is not None:
+            edits = self.aligner.align_encoded(
+                reference.codes, reference.classes, pred_text
+            )
+        else:
+            edits = self.aligner.align(ref_text, pred_text)
+
+        details = analysis["phoneme_details"]
+        errors = 0
+        for op, i, j in edits:
+            if op == EQUAL:
+                # Exact match
+                details.append(
+                    {
+                        "phoneme": ref_text[i],
+                        "correct": True,
+                        "similarity": 1.0,
+                        "similar_to": [],
+                    }
+                )
+                continue
+
+            errors += 1
+            if op == REPLACE:
                 # Substitution
                 ref_phoneme = ref_text[i]
                 pred_phoneme = pred_text[j]
-                similarity = self._calculate_phoneme_similarity(
-                    ref_phoneme, pred_phoneme
-                )
-                similar_sounds = self.similar_phonemes.get(ref_phoneme, [])
-                analysis["phoneme_details"].append(
+                details.append(
                     {
-                        'error': 'mispronounciation',
+                        "error": "mispronounciation",
                         "phoneme": ref_phoneme,
                         "correct": False,
-                        "similarity": similarity,
+                        "similarity": self.aligner.similarity_of(ref_phoneme, pred_phoneme),
                         "predicted_as": pred_phoneme,
-                        "similar_to": similar_sounds,
+                        "similar_to": self.similar_phonemes.get(ref_phoneme, []),
                     }
                 )
-                # i += 1
-                # j += 1
-            elif op == "delete":
-                source_modified.add(i)
+            elif op == DELETE:
                 # Deletion
-                ref_phoneme = ref_text[i]
-                analysis["phoneme_details"].append(
+                details.append(
                     {
                         "error": "omitted",
-                        "phoneme": ref_phoneme,
+                        "phoneme": ref_text[i],
                         "correct": False,
                         "similarity": 0.0,
                     }
                 )
-                # i += 1
-            elif op == "insert":
-                dest_modified.add(j)
+            else:
                 # Insertion
-                pred_phoneme = pred_text[j]
-                analysis["phoneme_details"].append(
+                details.append(
                     {
-                        'error': 'extra sound',
+                        "error": "extra sound",
                         "phoneme": "∅",
                         "correct": False,
                         "similarity": 0.0,
-                        "extra": pred_phoneme,
+                        "extra": pred_text[j],
                     }
                 )
-                # j += 1
 
-        equal_phonemes = [i for i in range(len(ref_text)) if i not in source_modified]
-        for i in equal_phonemes:
-            # Exact match
-                phoneme = ref_text[i]
-                analysis["phoneme_details"].append(
-                    {
-                        "phoneme": phoneme,
-                        "correct": True,
-                        "similarity": 1.0,
-                        "similar_to": [],
-                    }
-                )
-
-        # Need to preserve letter order
-        # analysis['phoneme_details'] = sorted(analysis['phoneme_details'], key=lambda x: ref_text.index(x['phoneme']))
+        # Every edit, extra sounds included, costs one correct phoneme
+        analysis["correct_phonemes"] = len(ref_text) - errors
 
         # Calculate overall accuracy
         analysis["accuracy"] = (
@@ -278,6 +274,111 @@ class PronunciationAnalyzer:
 
         return feedback
 
+    def analyze_batch(self, waveforms, sample_rate, reference_texts, predicted_texts):
+        """analyze_pronunciation over many utterances, with columnar results
+
+        Rhythm metrics come from padded, vectorized envelopes; each distinct
+        (reference, prediction) pair is aligned once however often it
+        repeats, as it does when a class practises the same words. Items
+        that fail to analyze get the single-utterance default values.
+        """
+        if not len(waveforms) == len(reference_texts) == len(predicted_texts):
+            raise ValueError("waveforms, reference_texts and predicted_texts must have the same length")
+
+        speech_rate, rhythm_regularity = batch_rhythm_metrics(waveforms, sample_rate)
+
+        alignments = {}
+        phoneme_analyses = []
+        for reference_text, predicted_text in zip(reference_texts, predicted_texts):
+            key = (reference_text.lower(), predicted_text.lower())
+            if key not in alignments:
+                try:
+                    alignments[key] = self._analyze_phonemes(reference_text, predicted_text)
+                except Exception as e:
+                    print(f"Error in analyze_batch: {str(e)}")
+                    alignments[key] = None
+            phoneme_analyses.append(alignments[key])
+
+        valid = np.array([analysis is not None for analysis in phoneme_analyses], dtype=bool)
+        default = self._get_default_analysis()["phoneme_analysis"]
+        phoneme_analyses = [analysis or default for analysis in phoneme_analyses]
+
+        accuracy = np.array([analysis["accuracy"] for analysis in phoneme_analyses], dtype=float)
+        rhythm_score = np.clip((1 - rhythm_regularity) * 100, 0, 100)
+        pronunciation_score = np.clip(0.5 * accuracy + 0.5 * rhythm_score, 0, 100)
+        pronunciation_score[~valid] = 0.0
+
+        return BatchAnalysis(
+            analyzer=self,
+            pronunciation_score=pronunciation_score,
+            accuracy=accuracy,
+            correct_phonemes=np.array([a["correct_phonemes"] for a in phoneme_analyses]),
+            total_phonemes=np.array([a["total_phonemes"] for a in phoneme_analyses]),
+            speech_rate=speech_rate,
+            rhythm_regularity=rhythm_regularity,
+            valid=valid,
+            phoneme_details=[a["phoneme_details"] for a in phoneme_analyses],
+        )
+
+
+class BatchAnalysis:
+    """Columnar results of PronunciationAnalyzer.analyze_batch
+
+    The numeric fields are NumPy arrays indexed like the inputs. Per-item
+    dicts in the analyze_pronunciation shape, feedback included, are only
+    built when asked for.
+    """
+
+    COLUMNS = (
+        "pronunciation_score",
+        "accuracy",
+        "correct_phonemes",
+        "total_phonemes",
+        "speech_rate",
+        "rhythm_regularity",
+        "valid",
+    )
+
+    def __init__(self, analyzer, phoneme_details, **columns):
+        self.analyzer = analyzer
+        self.phoneme_details = phoneme_details
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.pronunciation_score)
+
+    def columns(self):
+        """The numeric results as a dict of arrays, e.g. for a DataFrame"""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def to_dict(self, index):
+        """One item in the same shape analyze_pronunciation returns"""
+        if not self.valid[index]:
+            return self.analyzer._get_default_analysis()
+
+        # Repeated pairs share one alignment; hand out independent copies
+        phoneme_analysis = {
+            "total_phonemes": int(self.total_phonemes[index]),
+            "correct_phonemes": int(self.correct_phonemes[index]),
+            "phoneme_details": copy.deepcopy(self.phoneme_details[index]),
+            "accuracy": float(self.accuracy[index]),
+        }
+        rhythm = {
+            "speech_rate": float(self.speech_rate[index]),
+            "rhythm_regularity": float(self.rhythm_regularity[index]),
+        }
+        score = float(self.pronunciation_score[index])
+        return {
+            "pronunciation_score": score,
+            "phoneme_analysis": phoneme_analysis,
+            "rhythm_metrics": rhythm,
+            "detailed_feedback": self.analyzer._generate_feedback(score, phoneme_analysis, rhythm),
+        }
+
+    def to_dicts(self):
+        return [self.to_dict(index) for index in range(len(self))]
+
 
 def setup_analyzer():
     return PronunciationAnalyzer()
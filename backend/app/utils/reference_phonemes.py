@@ -0,0 +1,111 @@
+"""Reference pronunciation data precomputed per flashcard
+
+A flashcard's word is lowercased, mapped to IPA and encoded for the aligner
+once, when the card is created or its word changes, instead of on every
+analysis. The encoded form is stored as one version byte followed by one
+record per letter:
+
+    code              uint32  code point of the lowercased letter
+    similarity_class  uint8   row/column of the aligner's cost matrix
+
+Class ids index KAZAKH_ALPHABET, the alphabet PronunciationAnalyzer's
+aligner is built over; bump FORMAT_VERSION if either changes and
+ReferenceTable.load recomputes the stored rows.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from app.utils.alignment import (
+    KAZAKH_ALPHABET,
+    alphabet_lut,
+    encode_letters,
+    letter_classes,
+)
+from app.utils.phoneme_map import PHONEME_MAP
+
+FORMAT_VERSION = 1
+
+RECORD = np.dtype([("code", "<u4"), ("similarity_class", "u1")])
+
+_LUT = alphabet_lut(KAZAKH_ALPHABET)
+
+# codes and classes are what PhonemeAligner.align_encoded takes
+ReferencePhonemes = namedtuple("ReferencePhonemes", ["text", "ipa", "codes", "classes"])
+
+
+def pack_reference(word):
+    """(ipa, packed) for a flashcard word: the IPA list and the encoded letters"""
+    text = word.lower()
+    codes = encode_letters(text)
+    records = np.empty(len(codes), dtype=RECORD)
+    records["code"] = codes
+    records["similarity_class"] = letter_classes(codes, _LUT, len(KAZAKH_ALPHABET))
+    ipa = [PHONEME_MAP.get(letter, letter) for letter in text]
+    return ipa, bytes([FORMAT_VERSION]) + records.tobytes()
+
+
+def unpack_reference(word, ipa, packed):
+    """ReferencePhonemes from stored columns, or None if they are missing or stale"""
+    if not packed or packed[0] != FORMAT_VERSION or ipa is None:
+        return None
+    records = np.frombuffer(packed, dtype=RECORD, offset=1)
+    text = word.lower()
+    if len(records) != len(text):
+        return None
+    # Contiguous copies, so the kernel sees the same array types as align()
+    return ReferencePhonemes(
+        text,
+        list(ipa),
+        np.ascontiguousarray(records["code"]),
+        records["similarity_class"].astype(np.int64),
+    )
+
+
+def compute_reference(word):
+    """ReferencePhonemes for a word that has nothing stored"""
+    return unpack_reference(word, *pack_reference(word))
+
+
+class ReferenceTable:
+    """Every flashcard's ReferencePhonemes in memory, keyed by lowercased word
+
+    Filled once at start-up and kept current by the flashcard routes, so an
+    analysis looks its reference up instead of encoding it again.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text):
+        return self._entries.get(text.lower())
+
+    def put(self, flashcard):
+        reference = flashcard.reference()
+        self._entries[reference.text] = reference
+
+    def remove(self, text):
+        self._entries.pop(text.lower(), None)
+
+    def load(self, flashcards):
+        """Replace the table; returns how many cards had to be recomputed
+
+        Cards saved before their data existed, or with an older
+        FORMAT_VERSION, get it recomputed on the instance; the caller
+        commits the session to store it.
+        """
+        entries = {}
+        recomputed = 0
+        for flashcard in flashcards:
+            reference = unpack_reference(
+                flashcard.word, flashcard.reference_ipa, flashcard.reference_phonemes
+            )
+            if reference is None:
+                reference = flashcard.reference()
+                recomputed += 1
+            entries[reference.text] = reference
+        self._entries = entries
+        return recomputed
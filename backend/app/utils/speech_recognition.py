@@ -1,59 +1,132 @@
 from app.utils.pronunciation_analysis import setup_analyzer
-import os
-import tempfile
-import librosa
-import requests
+from app.utils.reference_phonemes import compute_reference
+from app.utils.rhythm import check_rhythm_metrics
+from app.utils.audio_io import read_upload, decode_audio, sniff_container
+from app.utils.vad import trim_silence
+from app.utils.result_cache import ANALYZER_VERSION, ResultCache, result_cache_key
+from app.utils.timing import span
+from app.utils.asr_backends import create_asr_backend
+from flask import current_app
+import numpy as np
 
 analyzer = None
+result_cache = None
+result_cache_version = ANALYZER_VERSION
+asr_backend = None
+
+def asr_cache_version(config):
+    """ANALYZER_VERSION plus the ASR settings, so backends never share cached results"""
+    return ":".join([
+        ANALYZER_VERSION,
+        config['ASR_BACKEND'],
+        config['ASR_URL'],
+        config['ASR_MODEL_NAME'],
+        str(config['ASR_HYBRID_LOCAL_MAX_SECONDS']),
+    ])
 
 def init_speech_model():
     """Initialize speech recognition and analysis models once at application startup"""
-    global analyzer
+    global analyzer, result_cache, result_cache_version, asr_backend
     
     try:
         # Initialize the pronunciation analyzer
         analyzer = setup_analyzer()
+
+        # Retried uploads of the same audio skip ASR and analysis entirely
+        result_cache = ResultCache(
+            max_entries=current_app.config['RESULT_CACHE_SIZE'],
+            disk_dir=current_app.config['RESULT_CACHE_DIR'],
+            max_disk_bytes=current_app.config['RESULT_CACHE_MAX_BYTES'],
+        )
+
+        result_cache_version = asr_cache_version(current_app.config)
+
+        # Remote service, in-process model or both, per ASR_BACKEND
+        asr_backend = create_asr_backend(current_app.config)
         
         print("Speech recognition models initialized successfully")
     except Exception as e:
         print(f"Error initializing speech models: {str(e)}")
         raise
 
+def warmup_speech_model():
+    """Run the analyzer once on synthetic audio so the first request pays no setup cost"""
+    if analyzer is None:
+        raise RuntimeError("Speech recognition models are not initialized")
+
+    asr_backend.warmup()
+
+    # A mispronounced prediction, so the alignment kernel is loaded too
+    waveform = (np.random.default_rng(0).standard_normal(16000) * 0.1).astype(np.float32)
+    analyzer.analyze_pronunciation(
+        waveform=waveform,
+        sample_rate=16000,
+        reference_text="сәлем",
+        predicted_text="салем",
+        reference=compute_reference("сәлем"),
+    )
+
+    # Scores are only comparable with older attempts while the peaks match
+    check_rhythm_metrics()
+
 def analyze_audio(audio_file, reference_text):
-    """Analyze audio pronunciation against reference text using pre-initialized models"""
+    """Analyze an uploaded file against reference text using pre-initialized models"""
+    with span("read"):
+        audio_bytes = read_upload(audio_file)
+
+    return analyze_audio_bytes(audio_bytes, reference_text)
+
+def analyze_audio_bytes(audio_bytes, reference_text):
+    """Analyze in-memory audio against reference text; used by background jobs too"""
     # Ensure models are initialized
     if analyzer is None:
         raise RuntimeError("Speech recognition models are not initialized")
-    
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-        temp_path = temp_file.name
-        audio_file.save(temp_path)
 
     try:
-        # Load audio for analysis
-        waveform, sample_rate = librosa.load(temp_path, sr=16000)
+        # Decode once in memory; a remote ASR gets the raw bytes, everything else the buffer
+        container = sniff_container(audio_bytes) or "unknown"
+        with span(f"decode_{container}"):
+            waveform, sample_rate = decode_audio(
+                audio_bytes,
+                resample_quality=current_app.config['AUDIO_RESAMPLE_QUALITY'],
+                max_duration=current_app.config['AUDIO_MAX_DURATION'],
+            )
+        if container != "wav":
+            # The ASR service takes WAV; a remote backend encodes the decoded buffer
+            audio_bytes = None
+
+        with span("cache"):
+            cache_key = result_cache_key(waveform, reference_text, result_cache_version)
+            cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Drop leading/trailing silence before any ASR or FFT work
+        if current_app.config.get('VAD_ENABLED', True):
+            with span("vad"):
+                trimmed, vad = trim_silence(waveform, sample_rate)
+            if not vad["speech_detected"] and current_app.config.get('VAD_REJECT_SILENT', False):
+                raise ValueError("No speech detected in the recording")
+            if len(trimmed) < len(waveform):
+                # The upload no longer matches; a remote backend re-encodes the trimmed clip
+                waveform = trimmed
+                audio_bytes = None
+        else:
+            duration = len(waveform) / sample_rate
+            vad = {"original_duration": duration, "trimmed_duration": duration}
 
-        files = {
-            "audio": open(temp_path, "rb"),
-        }
         # Get ASR result first
-        result = requests.post(
-            url="http://34.80.244.180:5000/transcribe",
-            files=files,
-        )
-        if result.status_code != 200:
-            raise RuntimeError("ASR service failed to process the audio")
-        files["audio"].close()
-        # Parse the ASR result
-        result = result.json()
-        predicted_text = result["transcription"]
-
-        # Get pronunciation analysis with both waveform and predicted text
+        with span("asr"):
+            predicted_text = asr_backend.transcribe(waveform, sample_rate, audio_bytes)
+
+        # Get pronunciation analysis with both waveform and predicted text;
+        # flashcard words have their reference encoded ahead of time
         pronunciation_analysis = analyzer.analyze_pronunciation(
             waveform=waveform,
             sample_rate=sample_rate,
             reference_text=reference_text,
             predicted_text=predicted_text,
+            reference=current_app.extensions['reference_phonemes'].get(reference_text),
         )
 
         # Combine the analyses
@@ -64,12 +137,16 @@ def analyze_audio(audio_file, reference_text):
             "pronunciation_score": pronunciation_analysis["pronunciation_score"],
             "rhythm_metrics": pronunciation_analysis["rhythm_metrics"],
             "detailed_feedback": pronunciation_analysis["detailed_feedback"],
+            "audio": {
+                "original_duration": vad["original_duration"],
+                "trimmed_duration": vad["trimmed_duration"],
+            },
         }
 
+        # A failed analysis may succeed on retry; keep it out of the cache
+        if not pronunciation_analysis.get("failed"):
+            result_cache.put(cache_key, response)
         return response
     except Exception as e:
         print(f"Error processing audio: {str(e)}")
-        raise
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
\ No newline at end of file
+        raise
\ No newline at end of file
@@ -0,0 +1,73 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupState:
+    """Tracks background start-up phases so /ready can report them"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.error = None
+        self.phases = {}
+        self.total_seconds = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @contextmanager
+    def phase(self, name):
+        """Time one start-up phase and record its duration in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round(time.perf_counter() - start, 3)
+
+    def run(self, target):
+        """Run target synchronously, flipping readiness when it succeeds"""
+        self.status = "loading"
+        start = time.perf_counter()
+        try:
+            target()
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            raise
+        else:
+            self.status = "ready"
+            self._ready.set()
+        finally:
+            self.total_seconds = round(time.perf_counter() - start, 3)
+
+    def run_in_background(self, target, on_done=None):
+        """Run target on a daemon thread; on_done receives the report"""
+
+        def runner():
+            try:
+                self.run(target)
+            except Exception:
+                pass
+            if on_done is not None:
+                on_done(self.report())
+
+        thread = threading.Thread(target=runner, name="startup", daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def report(self):
+        with self._lock:
+            phases = dict(self.phases)
+        return {
+            "status": self.status,
+            "phases": phases,
+            "total_seconds": self.total_seconds,
+            "error": self.error,
+        }
@@ -1,52 +1,65 @@
+import random
+import time
+
 import requests
-import dotenv
-import os
+from flask import current_app
 
-def get_pronunciation(word: str):
-    # Load environment variables from .env file
-    dotenv.load_dotenv()
-
-    # Get API URL and key from environment variables
-    api_url = os.getenv("SOYLE_API_URL")
-    api_key = os.getenv("SOYLE_API_KEY")
-
-    # Make a request to the API
-    response = requests.post(
-        url=api_url,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        json={
-            "source_language": "kaz",
-            "target_language": "kaz",
-            "text": word
-        }
-    )
-    response_dict = response.json()
-    # Check if the request was successful
-    if 'detail' in response_dict:
-        for i in range(10):
-            print(f"Attempt {i + 1}: Retrying pronunciation request...")
-            response = requests.post(
-                url=api_url,
+# Reused keep-alive connection to the TTS API
+_session = requests.Session()
+
+
+def synthesize(word: str):
+    """Call the Soyle TTS API for one word; returns (text, audio_bytes)
+
+    The API sometimes answers with a {"detail": ...} error body; those and
+    transport errors are retried a bounded number of times with jittered
+    exponential backoff instead of back-to-back.
+    """
+    config = current_app.config
+    language = config['TTS_LANGUAGE']
+    retries = config['TTS_RETRIES']
+
+    for attempt in range(retries + 1):
+        try:
+            response = _session.post(
+                url=config['SOYLE_API_URL'],
                 headers={
-                    'Authorization': f"Bearer {api_key}",
-                    'Content-Type': 'application/json',
+                    "Authorization": f"Bearer {config['SOYLE_API_KEY']}",
+                    "Content-Type": "application/json",
                 },
                 json={
-                    'source_language': 'kaz',
-                    'target_language': 'kaz',
-                    'text': word
-                }
+                    "source_language": language,
+                    "target_language": language,
+                    "text": word
+                },
+                timeout=config['TTS_TIMEOUT'],
             )
             response_dict = response.json()
-            if 'detail' not in response_dict:
-                break
-            if i == 9:
-                raise Exception(f"Error fetching pronunciation after 10 attempts: {response.status_code} - {response.text}")
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Error fetching pronunciation: {response.status_code} - {response.text}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            error = f"Error fetching pronunciation: {e}"
+        else:
+            if response.status_code == 200 and 'detail' not in response_dict:
+                # The API sends the audio as a hex string
+                return response_dict['text'], bytes.fromhex(response_dict['audio'])
+            error = f"Error fetching pronunciation: {response.status_code} - {response.text}"
+
+        if attempt < retries:
+            print(f"Attempt {attempt + 1}: Retrying pronunciation request...")
+            time.sleep(random.uniform(0, config['TTS_RETRY_BACKOFF'] * 2 ** attempt))
+
+    raise Exception(f"{error} (after {retries + 1} attempts)")
+
+
+def get_pronunciation_audio(word: str):
+    """Cached TTSAudio for word, synthesizing it once on a miss"""
+    config = current_app.config
+    return current_app.extensions['tts_cache'].get_or_fetch(
+        word,
+        config['TTS_LANGUAGE'],
+        lambda: synthesize(word),
+    )
+
+
+def get_pronunciation(word: str):
+    entry = get_pronunciation_audio(word)
+    return {'text': entry.text, 'audio': entry.audio.hex()}
@@ -0,0 +1,122 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+class StageHistograms:
+    """Per-stage latency histograms with fixed buckets, shared by all threads
+
+    Each process keeps its own, so with several workers every worker
+    reports only the requests it served.
+    """
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, duration_ms):
+        index = bisect_left(self.buckets, duration_ms)
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {
+                    "count": 0,
+                    "sum_ms": 0.0,
+                    "max_ms": 0.0,
+                    "counts": [0] * len(self.buckets),
+                }
+            entry["count"] += 1
+            entry["sum_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["counts"][index] += 1
+
+    def _quantile(self, entry, q):
+        """Upper bound of the bucket holding the q-th observation, capped at the max"""
+        rank = q * entry["count"]
+        seen = 0
+        for bound, count in zip(self.buckets, entry["counts"]):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, entry["max_ms"]), 3)
+        return round(entry["max_ms"], 3)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                name: dict(entry, counts=list(entry["counts"]))
+                for name, entry in self._stages.items()
+            }
+
+        report = {}
+        for name, entry in stages.items():
+            bounds = ["+Inf" if bound == float("inf") else str(bound) for bound in self.buckets]
+            report[name] = {
+                "count": entry["count"],
+                "mean_ms": round(entry["sum_ms"] / entry["count"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                # Bucket upper bounds, so these over- rather than under-estimate
+                "p50_ms": self._quantile(entry, 0.5),
+                "p95_ms": self._quantile(entry, 0.95),
+                "p99_ms": self._quantile(entry, 0.99),
+                # Cumulative counts per upper bound, Prometheus style
+                "buckets": dict(zip(bounds, _cumulative(entry["counts"]))),
+            }
+        return report
+
+
+def _cumulative(counts):
+    total = 0
+    for count in counts:
+        total += count
+        yield total
+
+
+@contextmanager
+def span(name):
+    """Time a block and attach it to the current request's Server-Timing
+
+    Outside a request (start-up warmup, benchmarks, CLI scripts) the block
+    still runs but nothing is recorded.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context():
+            duration_ms = (time.perf_counter() - start) * 1000
+            g.setdefault("timing_spans", []).append((name, duration_ms))
+
+
+def init_timing(app):
+    """Emit Server-Timing on every response and feed the stage histograms"""
+    histograms = StageHistograms()
+    app.extensions["timing"] = histograms
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        spans = g.pop("timing_spans", [])
+        started = g.pop("request_started", None)
+        if started is not None and spans:
+            spans.append(("total", (time.perf_counter() - started) * 1000))
+        if not spans:
+            return response
+
+        endpoint = request.endpoint or "unknown"
+        for name, duration_ms in spans:
+            histograms.observe(f"{endpoint}.{name}", duration_ms)
+
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={duration_ms:.1f}" for name, duration_ms in spans
+        )
+        return response
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+TTSAudio = namedtuple("TTSAudio", ["key", "text", "audio", "path"])
+
+
+def tts_cache_key(text, language):
+    """Content address of one synthesis request"""
+    digest = hashlib.sha256()
+    for part in (language, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class TTSCache:
+    """Synthesized pronunciations by (text, language)
+
+    Audio bytes live on disk as <key>.wav next to a <key>.json sidecar with
+    the upstream text, and the most recently used entries are also kept in
+    memory. Concurrent misses for the same key are single-flighted: one
+    caller runs fetch, the others wait for its result.
+    """
+
+    def __init__(self, disk_dir, max_entries=128):
+        self.disk_dir = disk_dir
+        self.max_entries = max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        os.makedirs(disk_dir, exist_ok=True)
+
+    def get_or_fetch(self, text, language, fetch):
+        """Cached entry, or fetch() -> (upstream_text, audio_bytes) stored first"""
+        key = tts_cache_key(text, language)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(entry)
+            return entry
+
+        with self._lock:
+            # A leader may have finished since the lookups above
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = {"done": threading.Event()}
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["entry"]
+
+        try:
+            upstream_text, audio = fetch()
+            entry = self._write_disk(key, text, language, upstream_text, audio)
+            with self._lock:
+                self._remember(entry)
+            flight["entry"] = entry
+            return entry
+        except Exception as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight["done"].set()
+
+    def contains(self, text, language):
+        key = tts_cache_key(text, language)
+        with self._lock:
+            if key in self._entries:
+                return True
+        return os.path.exists(self._path(key, ".json"))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "entries": len(self._entries),
+            }
+
+    def _remember(self, entry):
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.disk_dir, f"{key}{suffix}")
+
+    def _read_disk(self, key):
+        # The sidecar is written last, so its presence means the audio is complete
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(key, ".wav"), "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            return None
+        return TTSAudio(key, meta["text"], audio, self._path(key, ".wav"))
+
+    def _write_atomic(self, path, data):
+        # A unique temp name: several server processes may share the directory
+        with tempfile.NamedTemporaryFile(
+            dir=self.disk_dir, prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False
+        ) as f:
+            f.write(data)
+        os.replace(f.name, path)
+
+    def _write_disk(self, key, text, language, upstream_text, audio):
+        self._write_atomic(self._path(key, ".wav"), audio)
+        meta = {"source": text, "language": language, "text": upstream_text}
+        self._write_atomic(self._path(key, ".json"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return TTSAudio(key, upstream_text, audio, self._path(key, ".wav"))
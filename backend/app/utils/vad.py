@@ -0,0 +1,68 @@
+import numpy as np
+
+
+def frame_features(waveform, sample_rate, frame_ms=20):
+    """Per-frame energy (dBFS) and zero-crossing rate on non-overlapping frames"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(waveform) // frame_length
+    frames = waveform[: n_frames * frame_length].reshape(n_frames, frame_length)
+
+    energy = np.mean(frames * frames, axis=1, dtype=np.float64)
+    energy_db = 10.0 * np.log10(energy + 1e-12)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+
+    return energy_db, zcr, frame_length
+
+
+def trim_silence(
+    waveform,
+    sample_rate,
+    frame_ms=20,
+    dynamic_range_db=35.0,
+    min_energy_db=-55.0,
+    zcr_threshold=0.25,
+    padding_ms=100,
+):
+    """Trim leading and trailing silence with an energy/zero-crossing VAD
+
+    A frame counts as speech when its energy is within dynamic_range_db of
+    the loudest frame (and above min_energy_db), or when it is a quieter
+    but noisy frame with a high zero-crossing rate, which keeps fricatives
+    like "с" and "ш" at word edges. Returns the trimmed waveform and a dict
+    describing what was cut.
+    """
+    original_duration = len(waveform) / sample_rate
+    energy_db, zcr, frame_length = frame_features(waveform, sample_rate, frame_ms)
+
+    info = {
+        "speech_detected": False,
+        "original_duration": original_duration,
+        "trimmed_duration": original_duration,
+        "start": 0.0,
+        "end": original_duration,
+    }
+    if not len(energy_db):
+        return waveform, info
+
+    threshold = max(energy_db.max() - dynamic_range_db, min_energy_db)
+    noise_floor = np.percentile(energy_db, 10)
+    fricative = (zcr > zcr_threshold) & (energy_db > max(noise_floor + 6.0, min_energy_db))
+    speech = (energy_db > threshold) | fricative
+
+    speech_frames = np.flatnonzero(speech)
+    if not len(speech_frames):
+        return waveform, info
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, int(speech_frames[0]) * frame_length - padding)
+    end = min(len(waveform), (int(speech_frames[-1]) + 1) * frame_length + padding)
+
+    info.update(
+        speech_detected=True,
+        trimmed_duration=(end - start) / sample_rate,
+        start=start / sample_rate,
+        end=end / sample_rate,
+    )
+    return waveform[start:end], info
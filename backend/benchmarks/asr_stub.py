@@ -0,0 +1,143 @@
+"""Local stand-in for the remote ASR /transcribe endpoint.
+
+Answers POST /transcribe with {"transcription": ...} after an optional
+simulated inference delay, so benchmarks exercise the real HTTP upload
+path without depending on the remote GPU box. Speaks HTTP/1.1 so clients
+can keep connections alive, counts the connections it accepts, and can be
+told to fail or hang to exercise retries and the circuit breaker.
+
+Usage: python benchmarks/asr_stub.py [--port 5005] [--latency-ms 150]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ASRStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, a kept-alive
+    # connection stalls on the client's delayed ACK for ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        if self.path != "/transcribe":
+            self.send_error(404)
+            return
+
+        # Drain the multipart upload like the real service would
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.fail_remaining > 0
+            if failing:
+                self.server.fail_remaining -= 1
+
+        if self.server.hang_seconds:
+            time.sleep(self.server.hang_seconds)
+        if failing:
+            self.send_error(self.server.fail_status)
+            return
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+        body = json.dumps({"transcription": self.server.transcription}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ASRStub:
+    """Threaded stub server; set .transcription to choose what it answers
+
+    fail(count, status) makes the next count requests answer with status;
+    hang(seconds) delays every answer to simulate a stuck inference box.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, transcription=""):
+        self.server = ThreadingHTTPServer((host, port), ASRStubHandler)
+        self.server.latency_ms = latency_ms
+        self.server.transcription = transcription
+        self.server.requests = 0
+        self.server.connections = 0
+        self.server.fail_remaining = 0
+        self.server.fail_status = 503
+        self.server.hang_seconds = 0.0
+        self.server.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/transcribe"
+
+    @property
+    def transcription(self):
+        return self.server.transcription
+
+    @transcription.setter
+    def transcription(self, text):
+        self.server.transcription = text
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    @property
+    def connections(self):
+        return self.server.connections
+
+    def fail(self, count, status=503):
+        with self.server.lock:
+            self.server.fail_remaining = count
+            self.server.fail_status = status
+
+    def hang(self, seconds):
+        self.server.hang_seconds = seconds
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--transcription", default="сәлем")
+    args = parser.parse_args()
+
+    stub = ASRStub(args.host, args.port, args.latency_ms, args.transcription)
+    print(f"ASR stub listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Similarity-weighted alignment vs the Levenshtein.editops phoneme analysis.
+
+Times PronunciationAnalyzer._analyze_phonemes against the editops-based
+body it replaced on word- and sentence-length pairs, for the numba kernel
+(encoding the reference per call and with a flashcard's precomputed
+ReferencePhonemes) and the NumPy fallback, and checks that every alignment is ordered, never
+costs more than the plain edit distance and is the same from both DP
+implementations. Exits non-zero if a check fails.
+
+Usage: cd backend && python benchmarks/bench_alignment.py [--repeats 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import Levenshtein
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import alignment  # noqa: E402
+from app.utils.pronunciation_analysis import PronunciationAnalyzer  # noqa: E402
+from app.utils.reference_phonemes import compute_reference  # noqa: E402
+
+PAIRS = {
+    "word": [
+        ("рақмет", "ракмет"),
+        ("сәлем", "салем"),
+        ("қайырлы таң", "кайырлы тан"),
+        ("үйреніп", "уйренип"),
+    ],
+    "sentence": [
+        (
+            "мен қазақ тілін үйреніп жүрмін, бұл өте қызықты және пайдалы",
+            "мен казак тилин уйреніп журмин бул оте кызыкты жане пайдалы",
+        ),
+        (
+            "қайырлы таң, бүгін ауа райы жақсы болады деп ойлаймын",
+            "кайырлы тан бугин ава райы жаксы болад деп ойлаймн",
+        ),
+    ],
+}
+
+
+class LegacyAnalyzer(PronunciationAnalyzer):
+    """Phoneme analysis as it was: Levenshtein.editops, similarity applied afterwards"""
+
+    def _calculate_phoneme_similarity(self, reference_phoneme, predicted_phoneme):
+        """Calculate similarity between two phonemes"""
+        if reference_phoneme == predicted_phoneme:
+            return 1.0
+        elif (
+            reference_phoneme in self.similar_phonemes
+            and predicted_phoneme in self.similar_phonemes[reference_phoneme]
+        ):
+            return 0.5
+        return 0.0
+
+    def _analyze_phonemes(self, reference_text, predicted_text):
+        """The editops body _analyze_phonemes used before the weighted aligner"""
+        analysis = {
+            "total_phonemes": len(reference_text),
+            "correct_phonemes": 0,
+            "phoneme_details": [],
+        }
+
+        # Normalize texts
+        ref_text = reference_text.lower()
+        pred_text = predicted_text.lower()
+
+        # Calculate Levenshtein matrix for alignment
+        matrix = Levenshtein.editops(ref_text, pred_text)
+
+        # Analyze each phoneme
+        i = 0  # reference text index
+        j = 0  # predicted text index
+
+        if not matrix:  # Texts are identical
+            for phoneme in ref_text:
+                analysis["correct_phonemes"] += 1
+                analysis["phoneme_details"].append(
+                    {
+                        "phoneme": phoneme,
+                        "correct": True,
+                        "similarity": 1.0,
+                        "similar_to": [],
+                    }
+                )
+            analysis["accuracy"] = 100.0
+            return analysis
+
+        source_modified = set()
+        dest_modified = set()
+
+        analysis['correct_phonemes'] = len(ref_text) - len(matrix)
+        for op, i, j in matrix:
+            if op == "replace":
+                source_modified.add(i)
+                dest_modified.add(j)
+                # Substitution
+                ref_phoneme = ref_text[i]
+                pred_phoneme = pred_text[j]
+                similarity = self._calculate_phoneme_similarity(
+                    ref_phoneme, pred_phoneme
+                )
+                similar_sounds = self.similar_phonemes.get(ref_phoneme, [])
+                analysis["phoneme_details"].append(
+                    {
+                        'error': 'mispronounciation',
+                        "phoneme": ref_phoneme,
+                        "correct": False,
+                        "similarity": similarity,
+                        "predicted_as": pred_phoneme,
+                        "similar_to": similar_sounds,
+                    }
+                )
+            elif op == "delete":
+                source_modified.add(i)
+                # Deletion
+                ref_phoneme = ref_text[i]
+                analysis["phoneme_details"].append(
+                    {
+                        "error": "omitted",
+                        "phoneme": ref_phoneme,
+                        "correct": False,
+                        "similarity": 0.0,
+                    }
+                )
+            elif op == "insert":
+                dest_modified.add(j)
+                # Insertion
+                pred_phoneme = pred_text[j]
+                analysis["phoneme_details"].append(
+                    {
+                        'error': 'extra sound',
+                        "phoneme": "∅",
+                        "correct": False,
+                        "similarity": 0.0,
+                        "extra": pred_phoneme,
+                    }
+                )
+
+        equal_phonemes = [i for i in range(len(ref_text)) if i not in source_modified]
+        for i in equal_phonemes:
+            # Exact match
+            phoneme = ref_text[i]
+            analysis["phoneme_details"].append(
+                {
+                    "phoneme": phoneme,
+                    "correct": True,
+                    "similarity": 1.0,
+                    "similar_to": [],
+                }
+            )
+
+        # Calculate overall accuracy
+        analysis["accuracy"] = (
+            analysis["correct_phonemes"] / analysis["total_phonemes"]
+        ) * 100
+
+        return analysis
+
+
+def best_of(fn, pairs, repeats, rounds=5):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for reference, predicted in pairs:
+                fn(reference, predicted)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / (repeats * len(pairs)) * 1e6
+
+
+def check(aligner, pairs):
+    """Edits are in order, never cost more than the unweighted distance and
+    come out the same from the numba kernel and the NumPy fallback"""
+    for reference, predicted in pairs:
+        edits = aligner.align(reference, predicted)
+        ref, pred = alignment.encode_letters(reference), alignment.encode_letters(predicted)
+        fallback = alignment._align_numpy(
+            ref, alignment._NO_CLASSES, pred, aligner.lut, aligner.cost, aligner.indel_cost
+        )
+        if fallback.tolist() != edits or aligner.align_encoded(ref, aligner.classes(ref), predicted) != edits:
+            return False
+        if [i for op, i, _ in edits if op != alignment.INSERT] != list(range(len(reference))):
+            return False
+        if [j for op, _, j in edits if op != alignment.DELETE] != list(range(len(predicted))):
+            return False
+        cost = sum(
+            aligner.cost[aligner._index(reference[i]), aligner._index(predicted[j])]
+            if op == alignment.REPLACE else (op != alignment.EQUAL) * aligner.indel_cost
+            for op, i, j in edits
+        )
+        if cost > Levenshtein.distance(reference, predicted):
+            return False
+    return True
+
+
+def random_pairs(count, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = alignment.KAZAKH_ALPHABET + " ,"
+    return [
+        tuple("".join(rng.choice(list(letters), rng.integers(0, 20))) for _ in range(2))
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    analyzer = PronunciationAnalyzer()
+    # The first call compiles (or loads) the numba kernel
+    analyzer._analyze_phonemes(*PAIRS["word"][0])
+
+    ok = check(analyzer.aligner, [pair for pairs in PAIRS.values() for pair in pairs] + random_pairs(2000))
+    kernel = alignment._align_kernel
+
+    print(f"numba kernel: {'yes' if alignment.numba is not None else 'no (NumPy fallback)'}")
+    print(f"{'input':>10}  {'editops us':>10}  {'aligner us':>10}  {'ratio':>6}  {'stored us':>10}  {'numpy us':>10}")
+    for name, pairs in PAIRS.items():
+        references = {reference: compute_reference(reference) for reference, _ in pairs}
+        legacy = best_of(LegacyAnalyzer()._analyze_phonemes, pairs, args.repeats)
+        new = best_of(analyzer._analyze_phonemes, pairs, args.repeats)
+        stored = best_of(
+            lambda reference, predicted: analyzer._analyze_phonemes(reference, predicted, references[reference]),
+            pairs,
+            args.repeats,
+        )
+        alignment._align_kernel = alignment._align_numpy
+        fallback = best_of(analyzer._analyze_phonemes, pairs, max(1, args.repeats // 10))
+        alignment._align_kernel = kernel
+        print(f"{name:>10}  {legacy:10.1f}  {new:10.1f}  {new / legacy:5.2f}x  {stored:10.1f}  {fallback:10.1f}")
+
+    print("ok" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
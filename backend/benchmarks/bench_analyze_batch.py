@@ -0,0 +1,81 @@
+"""PronunciationAnalyzer.analyze_batch vs a loop of analyze_pronunciation.
+
+Builds a class-sized workload (many learners, a short word list, a few
+common mispronunciations per word) of synthetic clips, scores it both
+ways and reports the time of each plus the largest score difference.
+
+Usage: cd backend && python benchmarks/bench_analyze_batch.py [--items 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.pronunciation_analysis import PronunciationAnalyzer  # noqa: E402
+from clips import synthetic_word  # noqa: E402
+
+WORDS = {
+    "сәлем": ["сәлем", "салем", "сэлем"],
+    "рақмет": ["рақмет", "рахмет", "ракмет"],
+    "қайырлы таң": ["қайырлы таң", "кайырлы тан", "қайрлы таң"],
+    "үйреніп жүрмін": ["үйреніп жүрмін", "уйреніп жүрмін", "үйренип журмин"],
+    "ауа райы": ["ауа райы", "ава райы"],
+}
+
+
+def workload(items, seed=0):
+    rng = np.random.default_rng(seed)
+    words = list(WORDS)
+    waveforms, references, predictions = [], [], []
+    for i in range(items):
+        word = words[rng.integers(len(words))]
+        seconds = rng.uniform(0.4, 3.0)
+        waveforms.append(synthetic_word(seconds, syllables=max(1, int(seconds * 3)), seed=i))
+        references.append(word)
+        predictions.append(WORDS[word][rng.integers(len(WORDS[word]))])
+    return waveforms, references, predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    args = parser.parse_args()
+
+    analyzer = PronunciationAnalyzer()
+    waveforms, references, predictions = workload(args.items)
+    audio_seconds = sum(len(w) for w in waveforms) / 16000
+
+    start = time.perf_counter()
+    looped = [
+        analyzer.analyze_pronunciation(w, 16000, r, p)
+        for w, r, p in zip(waveforms, references, predictions)
+    ]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = analyzer.analyze_batch(waveforms, 16000, references, predictions)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.to_dicts()
+    to_dicts_s = time.perf_counter() - start
+
+    drift = max(
+        abs(item["pronunciation_score"] - score)
+        for item, score in zip(looped, batch.pronunciation_score)
+    )
+    print(f"{args.items} items, {audio_seconds:.0f} s of audio, "
+          f"{len(set(zip(references, predictions)))} distinct text pairs")
+    print(f"loop of analyze_pronunciation: {loop_s * 1000:8.1f} ms")
+    print(f"analyze_batch (columnar):      {batch_s * 1000:8.1f} ms  ({loop_s / batch_s:.1f}x)")
+    print(f"  + to_dicts():                {to_dicts_s * 1000:8.1f} ms")
+    print(f"largest score difference:      {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Connection reuse and failure handling of the pooled ASR client.
+
+Sends the same upload to the local ASR stub with a fresh requests.post
+per call (the old behaviour) and with ASRClient's keep-alive pool, from
+one thread and from several, and reports latency and how many TCP
+connections the stub had to accept. Then makes the stub fail and hang to
+show retries, the read timeout and the circuit breaker failing fast.
+
+On localhost a TCP handshake costs well under a millisecond, so the
+savings here are a floor; against the remote box each avoided connection
+saves at least one network round trip.
+
+Usage: cd backend && python benchmarks/bench_asr_client.py [--calls 200] [--threads 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.asr_client import ASRClient, ASRUnavailableError  # noqa: E402
+from app.utils.audio_io import encode_wav  # noqa: E402
+from asr_stub import ASRStub  # noqa: E402
+from clips import synthetic_word  # noqa: E402
+
+
+def fresh_connection_post(url, audio_bytes):
+    files = {"audio": ("audio.wav", audio_bytes, "audio/wav")}
+    response = requests.post(url, files=files)
+    response.raise_for_status()
+    return response.json()["transcription"]
+
+
+def run(call, calls, threads):
+    """Per-call latencies in ms and the wall time of the whole run"""
+
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if threads == 1:
+        latencies = [timed(i) for i in range(calls)]
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            latencies = list(pool.map(timed, range(calls)))
+    return np.array(latencies), time.perf_counter() - start
+
+
+def report(label, stub, call, calls, threads):
+    before = stub.connections
+    latencies, wall = run(call, calls, threads)
+    print(f"{label:>28} {threads:>7} {np.mean(latencies):>8.2f} {np.percentile(latencies, 50):>8.2f} "
+          f"{np.percentile(latencies, 95):>8.2f} {calls / wall:>9.1f} {stub.connections - before:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated ASR inference time")
+    args = parser.parse_args()
+
+    audio_bytes = encode_wav(synthetic_word(1.0, syllables=2))
+
+    with ASRStub(latency_ms=args.latency_ms, transcription="сәлем") as stub:
+        client = ASRClient(stub.url, pool_size=args.threads)
+
+        print(f"{'client':>28} {'threads':>7} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'calls/s':>9} {'connections':>11}")
+        for threads in sorted({1, args.threads}):
+            report("requests.post per call", stub,
+                   lambda: fresh_connection_post(stub.url, audio_bytes), args.calls, threads)
+            report("ASRClient (keep-alive pool)", stub,
+                   lambda: client.transcribe(audio_bytes), args.calls, threads)
+
+        print("\nFailure handling")
+        stub.fail(1)
+        start = time.perf_counter()
+        client.transcribe(audio_bytes)
+        print(f"  one 503 then success: {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"(retried={client.stats()['retried']})")
+
+        hung = ASRClient(stub.url, read_timeout=0.5, failure_threshold=3, reset_timeout=60)
+        stub.hang(5.0)
+        for attempt in range(5):
+            start = time.perf_counter()
+            try:
+                hung.transcribe(audio_bytes)
+            except ASRUnavailableError as e:
+                outcome = str(e).split(":")[0]
+            print(f"  hung service, call {attempt + 1}: {(time.perf_counter() - start) * 1000:8.1f} ms"
+                  f"  circuit={hung.breaker.state:<9} {outcome}")
+        stub.hang(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Packed phoneme_details vs the JSON column it replaced.
+
+Builds a progress history of analyzed attempts at a short word list and
+compares, per stored row, the bytes the JSON column took against the
+packed codec, the time to write and read one row both ways, and the time
+the stats routes spend aggregating per-letter totals from all rows.
+Exits non-zero if a packed row does not decode back to the same details.
+
+Usage: cd backend && python benchmarks/bench_phoneme_codec.py [--rows 5000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.phoneme_codec import (  # noqa: E402
+    decode_phoneme_details,
+    encode_phoneme_details,
+    phoneme_totals,
+)
+from app.utils.pronunciation_analysis import PronunciationAnalyzer  # noqa: E402
+from bench_analyze_batch import WORDS  # noqa: E402
+
+
+def attempts(rows, seed=0):
+    """(reference, prediction) pairs drawn like bench_analyze_batch's workload"""
+    rng = np.random.default_rng(seed)
+    words = list(WORDS)
+    pairs = []
+    for _ in range(rows):
+        word = words[rng.integers(len(words))]
+        pairs.append((word, WORDS[word][rng.integers(len(WORDS[word]))]))
+    return pairs
+
+
+def json_totals(rows):
+    """The per-letter loop the stats routes ran over JSON rows"""
+    phoneme_count = {}
+    for row in rows:
+        for phoneme_detail in json.loads(row):
+            phoneme = phoneme_detail["phoneme"]
+            if phoneme not in phoneme_count:
+                phoneme_count[phoneme] = {"correct": 0, "incorrect": 0, "total_similarity": 0, "count": 0}
+            phoneme_count[phoneme]["count"] += 1
+            if phoneme_detail["correct"]:
+                phoneme_count[phoneme]["correct"] += 1
+            else:
+                phoneme_count[phoneme]["incorrect"] += 1
+            phoneme_count[phoneme]["total_similarity"] += phoneme_detail["similarity"]
+    return phoneme_count
+
+
+def best_of(fn, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    analyzer = PronunciationAnalyzer()
+    details = [analyzer._analyze_phonemes(r, p)["phoneme_details"] for r, p in attempts(args.rows)]
+
+    # SQLAlchemy's JSON type stores json.dumps() output
+    json_rows = [json.dumps(d) for d in details]
+    packed_rows = [encode_phoneme_details(d) for d in details]
+    ok = all(decode_phoneme_details(p) == d for p, d in zip(packed_rows, details))
+
+    json_bytes = sum(len(r.encode("utf-8")) for r in json_rows)
+    packed_bytes = sum(len(r) for r in packed_rows)
+    n = len(details)
+
+    write_json = best_of(lambda: [json.dumps(d) for d in details]) / n * 1e6
+    write_packed = best_of(lambda: [encode_phoneme_details(d) for d in details]) / n * 1e6
+    read_json = best_of(lambda: [json.loads(r) for r in json_rows]) / n * 1e6
+    read_packed = best_of(lambda: [decode_phoneme_details(r) for r in packed_rows]) / n * 1e6
+    stats_json = best_of(lambda: json_totals(json_rows)) * 1000
+    stats_packed = best_of(lambda: phoneme_totals(packed_rows)) * 1000
+
+    expected = json_totals(json_rows)
+    totals = phoneme_totals(packed_rows)
+    ok = ok and list(totals) == list(expected) and all(
+        totals[p]["correct"] == expected[p]["correct"]
+        and totals[p]["count"] == expected[p]["count"]
+        and abs(totals[p]["total_similarity"] - expected[p]["total_similarity"]) < 1e-6
+        for p in expected
+    )
+
+    print(f"{n} rows, {sum(len(d) for d in details) / n:.1f} letters per row")
+    print(f"{'':>22}  {'json':>10}  {'packed':>10}")
+    print(f"{'bytes per row':>22}  {json_bytes / n:10.1f}  {packed_bytes / n:10.1f}  ({json_bytes / packed_bytes:.1f}x smaller)")
+    print(f"{'write us per row':>22}  {write_json:10.1f}  {write_packed:10.1f}")
+    print(f"{'read us per row':>22}  {read_json:10.1f}  {read_packed:10.1f}  (full dicts)")
+    print(f"{'stats ms, all rows':>22}  {stats_json:10.1f}  {stats_packed:10.1f}  ({stats_json / stats_packed:.1f}x)")
+    print("ok" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
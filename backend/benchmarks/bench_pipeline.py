@@ -0,0 +1,260 @@
+"""End-to-end latency of the /api/speech/analyze pipeline, stage by stage.
+
+Runs the same steps as analyze_speech on synthetic clips of several
+lengths (and on any recordings passed in): decode, decode + resample to
+16 kHz, VAD trim, ASR upload to a local stub standing in for the remote
+service, phoneme alignment, rhythm metrics, feedback and record_attempt (progress,
+phoneme stats and SM-2 write) against an in-memory SQLite app. Each stage reports
+its best-of-N time and its tracemalloc high-water mark.
+
+--save-baseline stores the numbers as JSON; --compare loads a baseline
+and exits non-zero when any stage got slower or hungrier than the
+tolerance allows.
+
+Usage: cd backend && python benchmarks/bench_pipeline.py [recordings/*.wav]
+           [--save-baseline benchmarks/baselines/pipeline.json]
+           [--compare benchmarks/baselines/pipeline.json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db  # noqa: E402
+from app.models.flashcards import Flashcard  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.user_flashcards import UserFlashcard  # noqa: E402
+from app.utils.asr_client import ASRClient  # noqa: E402
+from app.utils.audio_io import decode_audio, encode_wav  # noqa: E402
+from app.utils.pronunciation_analysis import PronunciationAnalyzer  # noqa: E402
+from app.utils.progress import record_attempt  # noqa: E402
+from app.utils.vad import trim_silence  # noqa: E402
+from asr_stub import ASRStub  # noqa: E402
+from clips import pad_with_silence, synthetic_word  # noqa: E402
+
+STAGES = ["decode", "decode_resample", "vad", "asr", "phonemes", "rhythm", "feedback", "db_write"]
+
+# (seconds of speech, syllables, reference text); uploads arrive at 48 kHz
+SYNTHETIC_CLIPS = [
+    (0.4, 1, "су"),
+    (0.8, 2, "сәлем"),
+    (1.5, 4, "қайырлы таң"),
+    (4.0, 10, "мен қазақ тілін үйреніп жүрмін"),
+    (10.0, 24, "бүгін ауа райы өте жақсы, біз саябаққа барып серуендедік"),
+]
+UPLOAD_SAMPLE_RATE = 48000
+
+
+def mispronounce(text):
+    """Swap one letter for a similar one so the feedback stage has work to do"""
+    swaps = {"қ": "к", "ә": "а", "ү": "у", "і": "ы", "с": "ш"}
+    for i, char in enumerate(text):
+        if char in swaps:
+            return text[:i] + swaps[char] + text[i + 1:]
+    return text[:-1]
+
+
+def load_clips(recordings, reference):
+    clips = []
+    for seed, (seconds, syllables, text) in enumerate(SYNTHETIC_CLIPS):
+        word = synthetic_word(seconds, UPLOAD_SAMPLE_RATE, syllables, seed=seed)
+        waveform = pad_with_silence(word, 0.3, 0.3, UPLOAD_SAMPLE_RATE, seed=seed)
+        name = f"synthetic-{seconds:g}s"
+        clips.append((name, encode_wav(waveform, UPLOAD_SAMPLE_RATE), text))
+
+    for path in recordings:
+        text_path = os.path.splitext(path)[0] + ".txt"
+        text = reference
+        if os.path.exists(text_path):
+            with open(text_path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+        with open(path, "rb") as f:
+            clips.append((os.path.basename(path), f.read(), text))
+    return clips
+
+
+class Pipeline:
+    """analyze_speech split into individually callable stages"""
+
+    def __init__(self, analyzer, asr_url, user_id, flashcard_id):
+        self.analyzer = analyzer
+        self.user_id = user_id
+        self.flashcard_id = flashcard_id
+        self.asr_client = ASRClient(asr_url)
+
+    def stages(self, audio_bytes, reference_text):
+        """(name, callable) pairs; each callable feeds state to the next"""
+        state = {}
+
+        def decode():
+            native_rate = sf.info(io.BytesIO(audio_bytes)).samplerate
+            decode_audio(audio_bytes, target_sample_rate=native_rate)
+
+        def decode_resample():
+            state["waveform"], state["sample_rate"] = decode_audio(audio_bytes)
+
+        def vad():
+            trimmed, _ = trim_silence(state["waveform"], state["sample_rate"])
+            state["waveform"] = trimmed
+            state["upload"] = encode_wav(trimmed, state["sample_rate"])
+
+        def asr():
+            state["predicted_text"] = self.asr_client.transcribe(state["upload"])
+
+        def phonemes():
+            state["phoneme_analysis"] = self.analyzer._analyze_phonemes(
+                reference_text, state["predicted_text"]
+            )
+
+        def rhythm():
+            state["rhythm_metrics"] = self.analyzer.calculate_rhythm_metrics(
+                state["waveform"], state["sample_rate"]
+            )
+
+        def feedback():
+            score = self.analyzer._calculate_overall_score(
+                state["phoneme_analysis"]["accuracy"],
+                state["rhythm_metrics"]["rhythm_regularity"],
+            )
+            state["score"] = score
+            self.analyzer._generate_feedback(
+                score, state["phoneme_analysis"], state["rhythm_metrics"]
+            )
+
+        def db_write():
+            record_attempt(self.user_id, self.flashcard_id, {
+                "phoneme_analysis": state["phoneme_analysis"],
+                "predicted_text": state["predicted_text"],
+                "pronunciation_score": state["score"],
+                "reference_text": reference_text,
+                "rhythm_metrics": state["rhythm_metrics"],
+            })
+
+        # Every run reviews a new card; repeated SM-2 reviews of one row grow
+        # its interval until the due date overflows
+        UserFlashcard.query.filter_by(
+            user_id=self.user_id, flashcard_id=self.flashcard_id
+        ).delete()
+        db.session.commit()
+
+        return list(zip(STAGES, [
+            decode, decode_resample, vad, asr, phonemes, rhythm, feedback, db_write
+        ]))
+
+
+def run_clip(pipeline, audio_bytes, reference_text, repeats):
+    """Best-of-N milliseconds per stage, then one traced run for peak memory"""
+    timings = {name: [] for name in STAGES}
+    for _ in range(repeats):
+        for name, stage in pipeline.stages(audio_bytes, reference_text):
+            start = time.perf_counter()
+            stage()
+            timings[name].append((time.perf_counter() - start) * 1000)
+
+    peaks = {}
+    for name, stage in pipeline.stages(audio_bytes, reference_text):
+        tracemalloc.start()
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks[name] = peak / 2**20
+
+    return {
+        name: {"ms": round(min(timings[name]), 3), "peak_mib": round(peaks[name], 3)}
+        for name in STAGES
+    }
+
+
+def compare(results, baseline, tolerance, min_ms, min_mib):
+    """Print per-stage deltas against a baseline; returns the regression count"""
+    regressions = 0
+    print(f"\n{'clip':>20} {'stage':>16} {'ms base':>9} {'ms now':>9} {'MiB base':>9} {'MiB now':>9}")
+    for clip, stages in results.items():
+        for name, now in stages.items():
+            base = baseline.get("clips", {}).get(clip, {}).get(name)
+            if base is None:
+                continue
+            slower = now["ms"] > base["ms"] * (1 + tolerance) and now["ms"] - base["ms"] > min_ms
+            hungrier = (
+                now["peak_mib"] > base["peak_mib"] * (1 + tolerance)
+                and now["peak_mib"] - base["peak_mib"] > min_mib
+            )
+            regressions += slower or hungrier
+            flag = "  SLOWER" if slower else ""
+            flag += "  MEMORY" if hungrier else ""
+            print(f"{clip:>20} {name:>16} {base['ms']:>9.2f} {now['ms']:>9.2f} "
+                  f"{base['peak_mib']:>9.2f} {now['peak_mib']:>9.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*", help=".wav files (reference from a sibling .txt)")
+    parser.add_argument("--reference", default="сәлем", help="reference for recordings without .txt")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--asr-latency-ms", type=float, default=0.0,
+                        help="simulated inference time in the ASR stub")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown / memory growth per stage")
+    parser.add_argument("--min-ms", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--min-mib", type=float, default=0.5,
+                        help="ignore memory growth smaller than this many MiB")
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    clips = load_clips(args.recordings, args.reference)
+
+    with app.app_context(), ASRStub(latency_ms=args.asr_latency_ms) as stub:
+        user = User("bench", "bench@example.com", "bench")
+        db.session.add(user)
+        db.session.commit()
+        pipeline = Pipeline(PronunciationAnalyzer(), stub.url, user.user_id, Flashcard.query.first().word_id)
+
+        results = {}
+        print(f"{'clip':>20} {'total ms':>9} " + " ".join(f"{name:>15}" for name in STAGES))
+        for name, audio_bytes, reference_text in clips:
+            stub.transcription = mispronounce(reference_text)
+            results[name] = run_clip(pipeline, audio_bytes, reference_text, args.repeats)
+            total = sum(stage["ms"] for stage in results[name].values())
+            cells = " ".join(
+                f"{stage['ms']:>8.2f}/{stage['peak_mib']:>5.1f}M" for stage in results[name].values()
+            )
+            print(f"{name:>20} {total:>9.2f} {cells}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "repeats": args.repeats,
+                    "asr_latency_ms": args.asr_latency_ms,
+                },
+                "clips": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_ms, args.min_mib)
+        if regressions:
+            print(f"\n{regressions} stage(s) regressed beyond tolerance {args.tolerance}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
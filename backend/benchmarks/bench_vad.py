@@ -0,0 +1,80 @@
+"""Time saved by VAD silence trimming on padded one-word clips.
+
+Times the analyzer (Hilbert rhythm metrics) and, with --model, a local
+wav2vec2 forward pass standing in for the remote ASR, on the padded clip
+versus the trimmed one.
+
+Usage: cd backend && python benchmarks/bench_vad.py [--model adilism/wav2vec2-large-xlsr-kazakh]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.pronunciation_analysis import PronunciationAnalyzer  # noqa: E402
+from app.utils.vad import trim_silence  # noqa: E402
+from clips import pad_with_silence, synthetic_word  # noqa: E402
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def load_asr(model_name):
+    import torch
+    from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+
+    def transcribe(waveform):
+        inputs = processor(waveform, sampling_rate=16000, return_tensors="pt")
+        with torch.no_grad():
+            model(inputs.input_values)
+
+    return transcribe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", help="time a local wav2vec2 pass as the ASR stand-in")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    analyzer = PronunciationAnalyzer()
+    transcribe = load_asr(args.model) if args.model else None
+
+    print(f"{'padding s':>9} {'orig s':>7} {'trim s':>7} {'vad ms':>7} "
+          f"{'analyze ms':>16} {'asr ms':>18}")
+    for padding in (0.25, 0.5, 1.0, 2.0):
+        waveform = pad_with_silence(synthetic_word(0.4, syllables=1), padding, padding)
+        vad_ms = best_of(lambda: trim_silence(waveform, 16000), args.repeats)
+        trimmed, info = trim_silence(waveform, 16000)
+
+        def analyze(clip):
+            return lambda: analyzer.analyze_pronunciation(clip, 16000, "су", "су")
+
+        analyze_full = best_of(analyze(waveform), args.repeats)
+        analyze_trim = best_of(analyze(trimmed), args.repeats)
+        asr = f"{'n/a':>18}"
+        if transcribe is not None:
+            asr_full = best_of(lambda: transcribe(waveform), args.repeats)
+            asr_trim = best_of(lambda: transcribe(trimmed), args.repeats)
+            asr = f"{asr_full:>8.1f} -> {asr_trim:>6.1f}"
+
+        print(f"{padding:>9.2f} {info['original_duration']:>7.2f} {info['trimmed_duration']:>7.2f} "
+              f"{vad_ms:>7.2f} {analyze_full:>7.1f} -> {analyze_trim:>5.1f} {asr}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Synthetic recordings shared by the backend benchmarks."""
+import numpy as np
+
+
+def synthetic_word(seconds=0.5, sample_rate=16000, syllables=2, seed=0):
+    """Voiced syllable bursts (harmonics under an amplitude envelope) plus breath noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = rng.uniform(110, 220)
+    voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    envelope = np.abs(np.sin(np.pi * syllables * t / seconds))
+    noise = rng.standard_normal(len(t)) * 0.02
+    return (0.3 * voiced * envelope + noise).astype(np.float32)
+
+
+def pad_with_silence(waveform, lead=1.0, tail=1.0, sample_rate=16000, noise_db=-60, seed=0):
+    """Surround a clip with low-level background noise, like a real upload"""
+    rng = np.random.default_rng(seed)
+    scale = 10 ** (noise_db / 20)
+    before = rng.standard_normal(int(lead * sample_rate)) * scale
+    after = rng.standard_normal(int(tail * sample_rate)) * scale
+    return np.concatenate([before, waveform, after]).astype(np.float32)
@@ -10,6 +10,58 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-dev-key'
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'static', 'uploads')
     MODEL_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+    # Load and warm up models on a background thread (the database is set up first);
+    # /ready reports progress. `flask` commands other than `run` skip start-up
+    STARTUP_IN_BACKGROUND = os.environ.get('STARTUP_IN_BACKGROUND', '1') == '1'
+    # Accepted upload formats and limits; compressed uploads cut upload time on slow links
+    AUDIO_ALLOWED_EXTENSIONS = {'wav', 'flac', 'ogg', 'oga', 'opus', 'webm'}
+    AUDIO_MAX_BYTES = int(os.environ.get('AUDIO_MAX_MB', '10')) * 1024 * 1024
+    AUDIO_MAX_DURATION = float(os.environ.get('AUDIO_MAX_SECONDS', '30'))
+    # Rejects oversized uploads before they are buffered; leaves room for the form fields
+    MAX_CONTENT_LENGTH = AUDIO_MAX_BYTES + 64 * 1024
+    # soxr quality for uploads not already at 16 kHz: VHQ, HQ (librosa's default), MQ, LQ
+    AUDIO_RESAMPLE_QUALITY = os.environ.get('AUDIO_RESAMPLE_QUALITY', 'HQ')
+    # Trim leading/trailing silence before ASR; optionally reject clips with no speech
+    VAD_ENABLED = os.environ.get('VAD_ENABLED', '1') == '1'
+    VAD_REJECT_SILENT = os.environ.get('VAD_REJECT_SILENT', '0') == '1'
+    # Analysis results keyed by decoded audio + reference text; disk tier is optional
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '256'))
+    RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR') or None
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_MB', '256')) * 1024 * 1024
+    # Soyle text-to-speech; synthesized audio is cached on disk by (text, language)
+    SOYLE_API_URL = os.environ.get('SOYLE_API_URL')
+    SOYLE_API_KEY = os.environ.get('SOYLE_API_KEY')
+    TTS_LANGUAGE = os.environ.get('TTS_LANGUAGE', 'kaz')
+    TTS_TIMEOUT = float(os.environ.get('TTS_TIMEOUT', '15'))
+    TTS_RETRIES = int(os.environ.get('TTS_RETRIES', '3'))
+    TTS_RETRY_BACKOFF = float(os.environ.get('TTS_RETRY_BACKOFF', '0.5'))
+    TTS_CACHE_DIR = os.environ.get('TTS_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')
+    TTS_CACHE_SIZE = int(os.environ.get('TTS_CACHE_SIZE', '128'))
+    TTS_AUDIO_MAX_AGE = int(os.environ.get('TTS_AUDIO_MAX_AGE', '86400'))
+    # ?async=1 analyses run on a local worker pool; beyond the queue limit clients get 429
+    ANALYZE_JOB_WORKERS = int(os.environ.get('ANALYZE_JOB_WORKERS', '2'))
+    ANALYZE_JOB_MAX_QUEUED = int(os.environ.get('ANALYZE_JOB_MAX_QUEUED', '32'))
+    ANALYZE_JOB_TTL = int(os.environ.get('ANALYZE_JOB_TTL', '600'))
+    # Where transcription runs: 'remote' (ASR_URL), 'local' (wav2vec2 in this process)
+    # or 'hybrid' (per clip, whichever has measured faster for that clip length)
+    ASR_BACKEND = os.environ.get('ASR_BACKEND', 'remote')
+    ASR_MODEL_NAME = os.environ.get('ASR_MODEL_NAME') or 'adilism/wav2vec2-large-xlsr-kazakh'
+    ASR_LOCAL_THREADS = int(os.environ.get('ASR_LOCAL_THREADS', '0')) or None
+    ASR_HYBRID_LOCAL_MAX_SECONDS = float(os.environ.get('ASR_HYBRID_LOCAL_MAX_SECONDS', '3'))
+    # Remote wav2vec2 transcription service: pooled keep-alive client with timeouts,
+    # jittered retries and a circuit breaker that fails fast while it is down
+    ASR_URL = os.environ.get('ASR_URL') or 'http://34.80.244.180:5000/transcribe'
+    ASR_CONNECT_TIMEOUT = float(os.environ.get('ASR_CONNECT_TIMEOUT', '3.05'))
+    ASR_READ_TIMEOUT = float(os.environ.get('ASR_READ_TIMEOUT', '30'))
+    ASR_RETRIES = int(os.environ.get('ASR_RETRIES', '2'))
+    ASR_RETRY_BACKOFF = float(os.environ.get('ASR_RETRY_BACKOFF', '0.2'))
+    ASR_POOL_SIZE = int(os.environ.get('ASR_POOL_SIZE', '10'))
+    ASR_BREAKER_THRESHOLD = int(os.environ.get('ASR_BREAKER_THRESHOLD', '5'))
+    ASR_BREAKER_RESET = float(os.environ.get('ASR_BREAKER_RESET', '30'))
+    # Comma-separated usernames allowed to read /metrics/*; /health and /ready stay open
+    METRICS_ADMIN_USERS = {
+        name.strip() for name in os.environ.get('METRICS_ADMIN_USERS', '').split(',') if name.strip()
+    }
     
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -17,6 +69,7 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    STARTUP_IN_BACKGROUND = False
     
 class ProductionConfig(Config):
     DEBUG = False
@@ -0,0 +1,102 @@
+"""Store user_progress.phoneme_details packed instead of as JSON
+
+Revision ID: 12c51ad1a420
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.phoneme_codec import decode_phoneme_details, encode_phoneme_details
+
+
+# revision identifiers, used by Alembic.
+revision = '12c51ad1a420'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Typed, so JSON is (de)serialized by the dialect instead of stored as a string scalar
+COLUMN_TYPES = {
+    'phoneme_details': sa.JSON(),
+    'phoneme_details_packed': sa.LargeBinary(),
+}
+
+
+def _columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'user_progress' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('user_progress')}
+
+
+def _convert(source, target, convert):
+    """Rewrite source into target for every row, BATCH_SIZE rows at a time"""
+    bind = op.get_bind()
+    table = sa.table(
+        'user_progress',
+        sa.column('id'),
+        sa.column(source, COLUMN_TYPES[source]),
+        sa.column(target, COLUMN_TYPES[target]),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c[source])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id')).values({target: sa.bindparam('value', type_=COLUMN_TYPES[target])}),
+            [{'row_id': row_id, 'value': convert(value)} for row_id, value in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def _pack(value):
+    # Rows written as JSON text by older code may still come back as str
+    details = json.loads(value) if isinstance(value, str) else value
+    return encode_phoneme_details(details or [])
+
+
+def _unpack(value):
+    return decode_phoneme_details(value)
+
+
+def upgrade():
+    # Databases created by db.create_all() may already have the new layout
+    columns = _columns()
+    if columns is None:
+        return
+
+    if 'phoneme_details_packed' not in columns:
+        with op.batch_alter_table('user_progress') as batch_op:
+            batch_op.add_column(sa.Column('phoneme_details_packed', sa.LargeBinary(), nullable=True))
+
+    if 'phoneme_details' in columns:
+        _convert('phoneme_details', 'phoneme_details_packed', _pack)
+        with op.batch_alter_table('user_progress') as batch_op:
+            batch_op.drop_column('phoneme_details')
+
+
+def downgrade():
+    columns = _columns()
+    if columns is None:
+        return
+
+    if 'phoneme_details' not in columns:
+        with op.batch_alter_table('user_progress') as batch_op:
+            batch_op.add_column(sa.Column('phoneme_details', sa.JSON(), nullable=True))
+
+    if 'phoneme_details_packed' in columns:
+        _convert('phoneme_details_packed', 'phoneme_details', _unpack)
+        with op.batch_alter_table('user_progress') as batch_op:
+            batch_op.drop_column('phoneme_details_packed')
@@ -0,0 +1,90 @@
+"""Store precomputed reference phonemes on flashcards
+
+Revision ID: 5e0b7d93c2f4
+Revises: 12c51ad1a420
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.reference_phonemes import pack_reference
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b7d93c2f4'
+down_revision = '12c51ad1a420'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'flashcards' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('flashcards')}
+
+
+def _backfill():
+    """Compute reference data for every card, BATCH_SIZE rows at a time"""
+    bind = op.get_bind()
+    table = sa.table(
+        'flashcards',
+        sa.column('word_id'),
+        sa.column('word'),
+        sa.column('reference_ipa', sa.JSON()),
+        sa.column('reference_phonemes', sa.LargeBinary()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.word_id, table.c.word)
+            .where(table.c.word_id > last_id)
+            .order_by(table.c.word_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for word_id, word in rows:
+            ipa, packed = pack_reference(word)
+            updates.append({'row_id': word_id, 'ipa': ipa, 'packed': packed})
+        bind.execute(
+            table.update()
+            .where(table.c.word_id == sa.bindparam('row_id'))
+            .values(
+                reference_ipa=sa.bindparam('ipa', type_=sa.JSON()),
+                reference_phonemes=sa.bindparam('packed', type_=sa.LargeBinary()),
+            ),
+            updates,
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # Databases created by db.create_all() may already have the columns
+    columns = _columns()
+    if columns is None:
+        return
+
+    with op.batch_alter_table('flashcards') as batch_op:
+        if 'reference_ipa' not in columns:
+            batch_op.add_column(sa.Column('reference_ipa', sa.JSON(), nullable=True))
+        if 'reference_phonemes' not in columns:
+            batch_op.add_column(sa.Column('reference_phonemes', sa.LargeBinary(), nullable=True))
+
+    _backfill()
+
+
+def downgrade():
+    columns = _columns()
+    if columns is None:
+        return
+
+    with op.batch_alter_table('flashcards') as batch_op:
+        if 'reference_phonemes' in columns:
+            batch_op.drop_column('reference_phonemes')
+        if 'reference_ipa' in columns:
+            batch_op.drop_column('reference_ipa')
@@ -0,0 +1,53 @@
+"""Add the phoneme_stats aggregate table
+
+Revision ID: 9a41f6e2b8d7
+Revises: 5e0b7d93c2f4
+Create Date: 2026-10-18 17:00:00.000000
+
+Existing attempts are not aggregated here; run `flask stats backfill`
+after upgrading.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a41f6e2b8d7'
+down_revision = '5e0b7d93c2f4'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    # Databases created by db.create_all() may already have the table
+    if 'phoneme_stats' in _tables():
+        return
+
+    op.create_table(
+        'phoneme_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('flashcard_id', sa.Integer(), nullable=False),
+        sa.Column('phoneme', sa.String(length=1), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('incorrect', sa.Integer(), nullable=False),
+        sa.Column('total_similarity', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['flashcard_id'], ['flashcards.word_id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'flashcard_id', 'phoneme', name='phoneme_stat_uc'),
+    )
+    op.create_index('ix_phoneme_stats_flashcard_id', 'phoneme_stats', ['flashcard_id'])
+
+
+def downgrade():
+    if 'phoneme_stats' not in _tables():
+        return
+
+    op.drop_index('ix_phoneme_stats_flashcard_id', table_name='phoneme_stats')
+    op.drop_table('phoneme_stats')
@@ -0,0 +1,297 @@
+"""Score recorded pronunciation attempts offline, in bulk.
+
+Takes a directory of <name>.wav + <name>.txt pairs, or a manifest (.csv
+with audio,reference columns or .jsonl with {"audio", "reference"}).
+Audio is decoded in a process pool, inference runs in padded batches on
+one model copy, and results stream to JSONL (or Parquet part files when
+the output ends in .parquet). Completed clips are recorded in a
+checkpoint file so an interrupted run resumes where it stopped. A clip
+that fails to decode or score gets a row with its "error" instead of
+stopping the run, and is checkpointed like any other.
+
+Usage: python batch_score.py attempts/ --output scores.jsonl --workers 4
+"""
+
+import argparse
+import csv
+import glob
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_io import decode_audio
+from batching import infer_batch
+from pronunciation_analysis import setup_analyzer
+
+MODEL_NAME = "adilism/wav2vec2-large-xlsr-kazakh"
+
+
+def read_pairs(source):
+    """(audio_path, reference_text) pairs from a directory or manifest"""
+    if os.path.isdir(source):
+        pairs = []
+        for audio_path in sorted(glob.glob(os.path.join(source, "*.wav"))):
+            text_path = os.path.splitext(audio_path)[0] + ".txt"
+            if not os.path.exists(text_path):
+                print(f"Skipping {audio_path}: no {os.path.basename(text_path)}")
+                continue
+            with open(text_path, "r", encoding="utf-8") as f:
+                pairs.append((audio_path, f.read().strip()))
+        return pairs
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        if source.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [(os.path.join(base, row["audio"]), row["reference"]) for row in rows]
+
+
+def init_decode_worker():
+    # The pool forks after the model loads; one intra-op thread per decode
+    # worker keeps torch from claiming every core again in each process
+    import torch
+
+    torch.set_num_threads(1)
+
+
+def decode_file(path):
+    """Runs in the decode pool"""
+    with open(path, "rb") as f:
+        waveform, _ = decode_audio(f.read())
+    return waveform
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def parquet_schema():
+    """Explicit column types, so parts holding only error rows still match"""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("audio", pa.string()),
+            ("reference_text", pa.string()),
+            ("predicted_text", pa.string()),
+            ("duration", pa.float64()),
+            ("pronunciation_score", pa.float64()),
+            ("confidence", pa.float64()),
+            ("accuracy", pa.float64()),
+            ("speech_rate", pa.float64()),
+            ("rhythm_regularity", pa.float64()),
+            ("timing_score", pa.float64()),
+            # JSON text; nested structs would vary with the letters in each part
+            ("phoneme_analysis", pa.string()),
+            ("error", pa.string()),
+        ]
+    )
+
+
+class ParquetWriter:
+    """One part file per flush, so resumed runs only ever add files"""
+
+    def __init__(self, path):
+        self.schema = parquet_schema()  # fails early when pyarrow is missing
+        self.directory = path
+        os.makedirs(path, exist_ok=True)
+        self.part = len(glob.glob(os.path.join(path, "part-*.parquet")))
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        flat = [
+            {
+                **row,
+                "phoneme_analysis": (
+                    None
+                    if row["phoneme_analysis"] is None
+                    else json.dumps(row["phoneme_analysis"])
+                ),
+            }
+            for row in rows
+        ]
+        path = os.path.join(self.directory, f"part-{self.part:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(flat, schema=self.schema), path)
+        self.part += 1
+
+    def close(self):
+        pass
+
+
+def error_row(audio_path, reference_text, error):
+    """Same columns as a scored row, so Parquet parts keep one schema"""
+    return {
+        "audio": audio_path,
+        "reference_text": reference_text,
+        "predicted_text": None,
+        "duration": 0.0,
+        "pronunciation_score": None,
+        "confidence": None,
+        "accuracy": None,
+        "speech_rate": None,
+        "rhythm_regularity": None,
+        "timing_score": None,
+        "phoneme_analysis": None,
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def score_clip(analyzer, audio_path, reference_text, waveform, transcription):
+    analysis = analyzer.analyze_pronunciation(
+        waveform=waveform,
+        sample_rate=16000,
+        reference_text=reference_text,
+        predicted_text=transcription.text,
+        logits=transcription.logits,
+    )
+    return {
+        "audio": audio_path,
+        "reference_text": reference_text,
+        "predicted_text": transcription.text,
+        "duration": len(waveform) / 16000,
+        "pronunciation_score": analysis["pronunciation_score"],
+        "confidence": analysis["confidence"],
+        "accuracy": analysis["phoneme_analysis"]["accuracy"],
+        "speech_rate": analysis["rhythm_metrics"]["speech_rate"],
+        "rhythm_regularity": analysis["rhythm_metrics"]["rhythm_regularity"],
+        "timing_score": analysis["timing_scores"]["timing_score"],
+        "phoneme_analysis": analysis["phoneme_analysis"],
+        "error": None,
+    }
+
+
+def score_batch(analyzer, batch, waveforms):
+    try:
+        transcriptions = infer_batch(analyzer.model, analyzer.processor, waveforms)
+    except Exception:
+        if len(batch) == 1:
+            raise
+        # Find the clip that breaks the padded pass; the rest still score
+        rows = []
+        for pair, waveform in zip(batch, waveforms):
+            try:
+                rows.extend(score_batch(analyzer, [pair], [waveform]))
+            except Exception as e:
+                rows.append(error_row(*pair, e))
+        return rows
+
+    rows = []
+    for (audio_path, reference_text), waveform, transcription in zip(
+        batch, waveforms, transcriptions
+    ):
+        try:
+            rows.append(
+                score_clip(
+                    analyzer, audio_path, reference_text, waveform, transcription
+                )
+            )
+        except Exception as e:
+            rows.append(error_row(audio_path, reference_text, e))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="directory of .wav/.txt pairs or a manifest")
+    parser.add_argument("--output", default="scores.jsonl")
+    parser.add_argument("--checkpoint", help="defaults to <output>.checkpoint")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="audio decode processes, each limited to one torch thread",
+    )
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--backend", default="fp32")
+    parser.add_argument("--export-dir", default="models")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    done = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            done = {line.rstrip("\n") for line in f}
+
+    pairs = [pair for pair in read_pairs(args.source) if pair[0] not in done]
+    print(f"{len(pairs)} clips to score ({len(done)} already done)")
+    if not pairs:
+        return
+
+    print("Loading model...")
+    analyzer = setup_analyzer(
+        args.model, backend=args.backend, export_dir=args.export_dir
+    )
+    writer = (
+        ParquetWriter(args.output)
+        if args.output.endswith(".parquet")
+        else JsonlWriter(args.output)
+    )
+
+    scored = 0
+    failed = 0
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=init_decode_worker
+    ) as pool, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        # Decoding runs a bounded distance ahead of the model so memory stays flat
+        lookahead = deque()
+        paths = iter([path for path, _ in pairs])
+        for path in itertools.islice(paths, args.workers * args.batch_size * 2):
+            lookahead.append(pool.submit(decode_file, path))
+
+        for offset in range(0, len(pairs), args.batch_size):
+            batch = pairs[offset : offset + args.batch_size]
+            decoded, waveforms, rows = [], [], []
+            for pair in batch:
+                try:
+                    waveforms.append(lookahead.popleft().result())
+                    decoded.append(pair)
+                except Exception as e:
+                    rows.append(error_row(*pair, e))
+                for path in itertools.islice(paths, 1):
+                    lookahead.append(pool.submit(decode_file, path))
+
+            if decoded:
+                rows.extend(score_batch(analyzer, decoded, waveforms))
+            writer.write(rows)
+            checkpoint.write("".join(f"{path}\n" for path, _ in batch))
+            checkpoint.flush()
+
+            scored += len(rows)
+            failed += sum(row["error"] is not None for row in rows)
+            audio_seconds += sum(row["duration"] for row in rows)
+            elapsed = time.perf_counter() - start
+            print(
+                f"\r{scored}/{len(pairs)} clips, {scored / elapsed:.2f} clips/s", end=""
+            )
+
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nScored {scored} clips ({audio_seconds:.1f} s of audio) in {elapsed:.1f} s:"
+        f" {scored / elapsed:.2f} clips/sec, {audio_seconds / elapsed:.1f}x real time"
+    )
+    if failed:
+        print(f'{failed} clips failed; see the "error" column of {args.output}')
+
+
+if __name__ == "__main__":
+    main()
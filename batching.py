@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+import torch
+
+Transcription = namedtuple("Transcription", ["text", "logits"])
+
+
+def output_lengths(config, input_lengths):
+    """Number of CTC frames the feature encoder produces for each input length"""
+    lengths = torch.as_tensor(input_lengths)
+    for kernel_size, stride in zip(config.conv_kernel, config.conv_stride):
+        lengths = torch.div(lengths - kernel_size, stride, rounding_mode="floor") + 1
+    return lengths.tolist()
+
+
+def infer_batch(model, processor, waveforms, sample_rate=16000):
+    """Run one padded forward pass and split logits/transcriptions per waveform"""
+    inputs = processor(
+        list(waveforms),
+        sampling_rate=sample_rate,
+        return_tensors="pt",
+        padding=True,
+        return_attention_mask=True,
+    )
+
+    with torch.no_grad():
+        logits = model(
+            inputs.input_values, attention_mask=inputs.attention_mask
+        ).logits
+
+    frame_counts = output_lengths(model.config, [len(w) for w in waveforms])
+    predicted_ids = torch.argmax(logits, dim=-1)
+
+    results = []
+    for index, frames in enumerate(frame_counts):
+        item_logits = logits[index : index + 1, :frames]
+        text = processor.decode(predicted_ids[index, :frames])
+        results.append(Transcription(text=text, logits=item_logits))
+    return results
+
+
+class MicroBatcher:
+    """Collect concurrent inference requests into padded Wav2Vec2ForCTC batches"""
+
+    def __init__(
+        self, model, processor, max_batch_size=8, max_wait_ms=10.0, sample_rate=16000
+    ):
+        self.model = model
+        self.processor = processor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name="asr-micro-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, waveform):
+        """Queue a 16 kHz waveform and return a Future resolving to a Transcription"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((waveform, future))
+        return future
+
+    def transcribe(self, waveform, timeout=None):
+        """Blocking helper around submit()"""
+        return self.submit(waveform).result(timeout=timeout)
+
+    def stats(self):
+        return {
+            "mode": "in_process",
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def close(self):
+        """Stop accepting work and let the worker drain the queue"""
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the sentinel so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [
+                (waveform, future)
+                for waveform, future in self._collect(first)
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            try:
+                results = infer_batch(
+                    self.model,
+                    self.processor,
+                    [waveform for waveform, _ in batch],
+                    sample_rate=self.sample_rate,
+                )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
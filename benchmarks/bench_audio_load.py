@@ -0,0 +1,84 @@
+"""Upload decoding: audio_io.decode_audio vs librosa.load(sr=16000).
+
+Encodes the same few seconds of audio the ways browsers and phones send
+it (16 kHz mono PCM, 48 kHz and 44.1 kHz stereo PCM, 16 kHz float) and
+times both loaders from an in-memory upload, reporting the best-of-N
+time, the speed-up and the largest sample difference. Pass --quality to
+see the soxr quality/speed trade-off on the resampling cases.
+
+Usage: python benchmarks/bench_audio_load.py [--seconds 3] [--quality HQ MQ LQ]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_io import decode_audio, pcm16_view  # noqa: E402
+
+UPLOADS = [
+    ("16k mono pcm16", 16000, 1, "PCM_16"),
+    ("16k mono float", 16000, 1, "FLOAT"),
+    ("48k mono pcm16", 48000, 1, "PCM_16"),
+    ("44.1k stereo pcm16", 44100, 2, "PCM_16"),
+]
+
+
+def upload(seconds, sample_rate, channels, subtype, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voiced = 0.3 * np.sin(2 * np.pi * 160 * t) * np.abs(np.sin(np.pi * 3 * t))
+    noise = 0.01 * rng.standard_normal((len(t), channels))
+    waveform = voiced[:, None] + noise
+    buffer = io.BytesIO()
+    sf.write(buffer, waveform, sample_rate, subtype=subtype, format="WAV")
+    return buffer.getvalue()
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--quality", nargs="+", default=["HQ"])
+    args = parser.parse_args()
+
+    print(
+        f"{'upload':>20} {'quality':>7} {'fast path':>9} {'librosa ms':>10}"
+        f" {'decode ms':>9} {'speed-up':>8} {'max diff':>9}"
+    )
+    for name, sample_rate, channels, subtype in UPLOADS:
+        data = upload(args.seconds, sample_rate, channels, subtype)
+        reference, librosa_ms = best_of(
+            lambda: librosa.load(io.BytesIO(data), sr=16000)[0], args.repeats
+        )
+        qualities = args.quality if sample_rate != 16000 else args.quality[:1]
+        for quality in qualities:
+            waveform, decode_ms = best_of(
+                lambda: decode_audio(data, resample_quality=quality)[0], args.repeats
+            )
+            diff = float(np.max(np.abs(waveform - reference)))
+            print(
+                f"{name:>20} {quality:>7} {str(pcm16_view(data) is not None):>9}"
+                f" {librosa_ms:>10.2f} {decode_ms:>9.2f}"
+                f" {librosa_ms / decode_ms:>7.1f}x {diff:>9.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput/latency of the micro-batching ASR queue on CPU.
+
+Usage: python benchmarks/bench_batching.py [--requests 64] [--seconds 1.5]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batching import MicroBatcher  # noqa: E402
+
+MODEL_NAME = "adilism/wav2vec2-large-xlsr-kazakh"
+BATCH_SIZES = [1, 2, 4, 8, 16]
+
+
+def synthetic_clips(count, seconds, sample_rate=16000, seed=0):
+    """Noise bursts with varying length, roughly like short word recordings"""
+    rng = np.random.default_rng(seed)
+    clips = []
+    for _ in range(count):
+        length = int(sample_rate * seconds * rng.uniform(0.6, 1.4))
+        clips.append((rng.standard_normal(length) * 0.1).astype(np.float32))
+    return clips
+
+
+def run(batcher, clips, concurrency):
+    latencies = []
+
+    def one(clip):
+        start = time.perf_counter()
+        batcher.transcribe(clip)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, clips))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "rps": len(clips) / elapsed,
+        "p50": float(np.percentile(latencies_ms, 50)),
+        "p99": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=1.5)
+    parser.add_argument("--max-wait-ms", type=float, default=20.0)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    print("Loading model...")
+    processor = Wav2Vec2Processor.from_pretrained(MODEL_NAME)
+    model = Wav2Vec2ForCTC.from_pretrained(MODEL_NAME).eval()
+    clips = synthetic_clips(args.requests, args.seconds)
+
+    # Warm up allocator and kernels so batch size 1 is not penalised
+    warmup = MicroBatcher(model, processor, max_batch_size=1)
+    try:
+        warmup.transcribe(clips[0])
+    finally:
+        warmup.close()
+
+    print(f"{'batch':>5} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for batch_size in BATCH_SIZES:
+        batcher = MicroBatcher(
+            model, processor, max_batch_size=batch_size, max_wait_ms=args.max_wait_ms
+        )
+        try:
+            stats = run(batcher, clips, concurrency=batch_size * 2)
+        finally:
+            batcher.close()
+        print(
+            f"{batch_size:>5} {stats['rps']:>8.2f} {stats['p50']:>9.1f} {stats['p99']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
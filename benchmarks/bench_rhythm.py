@@ -0,0 +1,92 @@
+"""Regression check and benchmark: rhythm engine vs hilbert + find_peaks.
+
+Compares speech_rate / rhythm_regularity from rhythm.rhythm_metrics with the
+previous implementation (hilbert + find_peaks on the raw 16 kHz signal) on
+synthetic clips of awkward lengths and on any .wav files passed in, and
+reports time and peak memory of both. Exits non-zero if the metrics drift
+beyond the tolerance. check_rhythm_metrics runs a smaller form of this
+comparison at every start-up.
+
+Usage: python benchmarks/bench_rhythm.py [recordings/*.wav] [--tolerance 1e-3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_io import decode_audio  # noqa: E402
+from rhythm import hilbert_rhythm_metrics, rhythm_metrics  # noqa: E402
+
+
+def synthetic_clip(samples, sample_rate=16000, seed=0):
+    """Syllable-like bursts at an irregular pace, plus background noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(samples) / sample_rate
+    rate = rng.uniform(2.5, 5.0)
+    envelope = np.abs(np.sin(np.pi * rate * t + rng.uniform(0, np.pi))) ** 2
+    voiced = np.sin(2 * np.pi * rng.uniform(110, 220) * t)
+    return (0.3 * envelope * voiced + 0.01 * rng.standard_normal(samples)).astype(
+        np.float32
+    )
+
+
+def measure(fn, waveform):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(waveform, 16000)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*", help=".wav files to compare on")
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    clips = []
+    # Prime and near-prime lengths, which neither side may pad away
+    for seed, samples in enumerate([15_991, 32_003, 48_017, 80_021, 160_001]):
+        clips.append((f"synthetic-{samples}", synthetic_clip(samples, seed=seed)))
+    for path in args.recordings:
+        with open(path, "rb") as f:
+            clips.append((os.path.basename(path), decode_audio(f.read())[0]))
+
+    failures = 0
+    print(
+        f"{'clip':>20} {'rate old':>9} {'rate new':>9} {'reg old':>8} {'reg new':>8}"
+        f" {'ms old':>8} {'ms new':>8} {'MiB old':>8} {'MiB new':>8}"
+    )
+    for name, waveform in clips:
+        old, old_ms, old_mib = measure(hilbert_rhythm_metrics, waveform)
+        new, new_ms, new_mib = measure(rhythm_metrics, waveform)
+
+        rate_drift = abs(new["speech_rate"] - old["speech_rate"]) / max(
+            old["speech_rate"], 1e-6
+        )
+        regularity_drift = abs(new["rhythm_regularity"] - old["rhythm_regularity"])
+        ok = rate_drift <= args.tolerance and regularity_drift <= args.tolerance
+        failures += not ok
+
+        print(
+            f"{name:>20} {old['speech_rate']:>9.2f} {new['speech_rate']:>9.2f}"
+            f" {old['rhythm_regularity']:>8.3f} {new['rhythm_regularity']:>8.3f}"
+            f" {old_ms:>8.1f} {new_ms:>8.1f} {old_mib:>8.2f} {new_mib:>8.2f}"
+            f"{'' if ok else '  DRIFT'}"
+        )
+
+    if failures:
+        print(f"\n{failures} clip(s) drifted beyond tolerance {args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Compare fp32 / int8 / ONNX inference backends on a set of recordings.
+
+Reports load time, peak RSS, per-clip latency and transcription drift
+(character error rate against the fp32 output, and against the reference
+text when a matching .txt file sits next to the recording).
+
+Usage: python benchmarks/compare_backends.py recordings/ --backends fp32 int8 onnx
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import Levenshtein
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_io import decode_audio  # noqa: E402
+from inference_backends import BACKENDS  # noqa: E402
+
+MODEL_NAME = "adilism/wav2vec2-large-xlsr-kazakh"
+
+
+def load_recordings(directory):
+    recordings = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with open(path, "rb") as f:
+            waveform, _ = decode_audio(f.read())
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                reference = f.read().strip()
+        recordings.append((os.path.basename(path), waveform, reference))
+    return recordings
+
+
+def measure_backend(model_name, backend, export_dir, recordings, repeats, results):
+    """Runs in a fresh process so RSS reflects only this backend"""
+    from pronunciation_analysis import setup_analyzer
+
+    start = time.perf_counter()
+    analyzer = setup_analyzer(model_name, backend=backend, export_dir=export_dir)
+    load_time = time.perf_counter() - start
+
+    # Warmup so the first clip does not carry allocator/kernel setup
+    analyzer.infer(recordings[0][1], 16000)
+
+    latencies = []
+    texts = {}
+    for name, waveform, _ in recordings:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            text, _ = analyzer.infer(waveform, 16000)
+            latencies.append(time.perf_counter() - start)
+        texts[name] = text
+
+    results[backend] = {
+        "load_time": load_time,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latencies": latencies,
+        "texts": texts,
+    }
+
+
+def character_error_rate(hypothesis, reference):
+    return Levenshtein.distance(hypothesis, reference) / max(len(reference), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", help="directory of .wav files (+ optional .txt)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument("--export-dir", default="models")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings)
+    if not recordings:
+        parser.error(f"no .wav files found in {args.recordings}")
+
+    backends = list(dict.fromkeys(["fp32"] + args.backends))
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for backend in backends:
+        print(f"Measuring {backend}...")
+        process = context.Process(
+            target=measure_backend,
+            args=(
+                args.model,
+                backend,
+                args.export_dir,
+                recordings,
+                args.repeats,
+                results,
+            ),
+        )
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"  {backend} failed (exit code {process.exitcode})")
+
+    baseline = results["fp32"]["texts"]
+    print(
+        f"\n{'backend':>10} {'load s':>8} {'RSS MB':>8} {'mean ms':>9} {'p50 ms':>8}"
+        f" {'p99 ms':>8} {'CER vs fp32':>12} {'CER vs ref':>11}"
+    )
+    for backend in backends:
+        if backend not in results:
+            continue
+        stats = results[backend]
+        latencies_ms = np.array(stats["latencies"]) * 1000
+        drift = np.mean(
+            [
+                character_error_rate(text, baseline[name])
+                for name, text in stats["texts"].items()
+            ]
+        )
+        references = [
+            character_error_rate(stats["texts"][name], reference)
+            for name, _, reference in recordings
+            if reference is not None
+        ]
+        reference_cer = (
+            f"{np.mean(references):>11.4f}" if references else f"{'n/a':>11}"
+        )
+        print(
+            f"{backend:>10} {stats['load_time']:>8.2f} {stats['peak_rss_mb']:>8.0f}"
+            f" {latencies_ms.mean():>9.1f} {np.percentile(latencies_ms, 50):>8.1f}"
+            f" {np.percentile(latencies_ms, 99):>8.1f} {drift:>12.4f} {reference_cer}"
+        )
+
+
+if __name__ == "__main__":
+    main()
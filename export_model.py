@@ -0,0 +1,38 @@
+"""One-off export of the Kazakh wav2vec2 model for the int8 / ONNX backends.
+
+The ONNX exports need requirements-onnx.txt installed.
+
+Usage: python export_model.py --backend all --output-dir models
+"""
+
+import argparse
+
+from transformers import Wav2Vec2ForCTC
+
+from inference_backends import export_int8, export_onnx
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="adilism/wav2vec2-large-xlsr-kazakh")
+    parser.add_argument(
+        "--backend", choices=["int8", "onnx", "onnx-int8", "all"], default="all"
+    )
+    parser.add_argument("--output-dir", default="models")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    print("Loading model...")
+    model = Wav2Vec2ForCTC.from_pretrained(args.model).eval()
+
+    if args.backend in ("int8", "all"):
+        print(f"Saved {export_int8(model, args.output_dir)}")
+    if args.backend in ("onnx", "onnx-int8", "all"):
+        # The int8 ONNX graph is quantized from the fp32 export written alongside it
+        quantize = args.backend != "onnx"
+        path = export_onnx(model, args.output_dir, opset=args.opset, quantize=quantize)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
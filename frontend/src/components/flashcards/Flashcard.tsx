@@ -30,6 +30,7 @@ interface FlashcardData {
   rus_translation: string;
   phonetic: string;
   audio: string;
+  audio_url: string;
 }
 
 interface FlashCardProps {
@@ -49,7 +50,7 @@ const FlashCard: React.FC<FlashCardProps> = ({
   const [isFavorite, setIsFavorite] = useState(false);
 
   const playAudio = () => {
-    const audio = new Audio(`/audio/${card.audio}`);
+    const audio = new Audio(card.audio_url);
     audio.play();
   };
 
@@ -127,7 +128,6 @@ const FlashCard: React.FC<FlashCardProps> = ({
                       size="lg"
                       color="blue"
                       variant="light"
-                      disabled={card.audio === "default.wav"}
                       onClick={playAudio}
                     >
                       <Volume2 size={20} />
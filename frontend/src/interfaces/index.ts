@@ -33,6 +33,7 @@ export interface Flashcard {
   rus_translation: string;
   phonetic: string;
   audio: string;
+  audio_url: string;
 }
 
 export interface CreateFlashcardData {
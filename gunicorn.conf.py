@@ -1,5 +1,52 @@
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Absolute, so --chdir or a service manager's working directory does not matter
+INFERENCE_POOL_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "inference_pool.py"
+)
 
 bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
-workers = 1
 timeout = 120
+
+# With INFERENCE_POOL_SIZE > 0 the model lives in a separate inference pool
+# (inference_pool.py), so web workers are cheap and can be scaled freely.
+# Pool jobs run one waveform each, without the micro-batching of batching.py.
+# Otherwise each worker holds its own model copy and we keep a single one.
+inference_pool_size = int(os.environ.get("INFERENCE_POOL_SIZE", "0"))
+workers = int(os.environ.get("WEB_CONCURRENCY", "2" if inference_pool_size else "1"))
+
+# The pool's socket goes in a fresh 0700 directory and its authkey is random
+# per launch. Both reach the pool and the web workers through the environment,
+# set here so they are in place before the app is imported (even with preload).
+inference_pool_dir = None
+if inference_pool_size:
+    if "INFERENCE_POOL_ADDRESS" not in os.environ:
+        inference_pool_dir = tempfile.mkdtemp(prefix="kazakh-inference-")
+        os.environ["INFERENCE_POOL_ADDRESS"] = os.path.join(
+            inference_pool_dir, "inference.sock"
+        )
+    os.environ.setdefault("INFERENCE_POOL_AUTHKEY", os.urandom(32).hex())
+
+# Concurrent requests in a worker share the model through the
+# micro-batcher in batching.py, so threads raise throughput without extra memory
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+
+def on_starting(server):
+    if inference_pool_size:
+        server.inference_pool = subprocess.Popen(
+            [sys.executable, INFERENCE_POOL_SCRIPT, "--size", str(inference_pool_size)]
+        )
+
+
+def on_exit(server):
+    inference_pool = getattr(server, "inference_pool", None)
+    if inference_pool is not None:
+        inference_pool.terminate()
+        inference_pool.wait()
+    if inference_pool_dir is not None:
+        shutil.rmtree(inference_pool_dir, ignore_errors=True)
@@ -0,0 +1,138 @@
+import os
+
+import torch
+from transformers import Wav2Vec2Config, Wav2Vec2ForCTC
+from transformers.modeling_outputs import CausalLMOutput
+
+BACKENDS = ("fp32", "int8", "onnx", "onnx-int8")
+
+INT8_FILENAME = "model.int8.pt"
+ONNX_FILENAME = "model.onnx"
+ONNX_INT8_FILENAME = "model.int8.onnx"
+
+
+def import_onnx(module="onnxruntime"):
+    """Import an ONNX package, which only the onnx backends install"""
+    import importlib
+
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"The onnx backends need {module}: pip install -r requirements-onnx.txt"
+        ) from e
+
+
+class OnnxWav2Vec2:
+    """ONNX Runtime session that quacks like Wav2Vec2ForCTC for inference"""
+
+    def __init__(self, path, config, num_threads=None):
+        ort = import_onnx()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.config = config
+
+    def __call__(self, input_values, attention_mask=None):
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_values, dtype=torch.long)
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_values": input_values.numpy().astype("float32"),
+                "attention_mask": attention_mask.numpy().astype("int64"),
+            },
+        )
+        return CausalLMOutput(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers (transformer blocks)"""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def export_int8(model, export_dir):
+    """Save the quantized state dict so workers skip loading fp32 weights"""
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, INT8_FILENAME)
+    torch.save(quantize_int8(model).state_dict(), path)
+    return path
+
+
+def export_onnx(model, export_dir, opset=17, quantize=False):
+    """Export Wav2Vec2ForCTC to ONNX with dynamic batch and time axes"""
+    import_onnx("onnx")  # torch.onnx.export writes the graph through it
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, ONNX_FILENAME)
+    dummy_input = torch.zeros(1, 16000, dtype=torch.float32)
+    dummy_mask = torch.ones(1, 16000, dtype=torch.long)
+
+    torch.onnx.export(
+        model,
+        (dummy_input, dummy_mask),
+        path,
+        input_names=["input_values", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_values": {0: "batch", 1: "samples"},
+            "attention_mask": {0: "batch", 1: "samples"},
+            "logits": {0: "batch", 1: "frames"},
+        },
+        opset_version=opset,
+    )
+
+    if not quantize:
+        return path
+
+    quantization = import_onnx("onnxruntime.quantization")
+
+    quantized_path = os.path.join(export_dir, ONNX_INT8_FILENAME)
+    quantization.quantize_dynamic(
+        path, quantized_path, weight_type=quantization.QuantType.QInt8
+    )
+    return quantized_path
+
+
+def load_model(model_name, backend="fp32", export_dir="models"):
+    """Load the CTC model for the selected inference backend
+
+    fp32 and int8 work straight from the Hugging Face checkpoint (int8 is
+    quantized on the fly when no export exists); the ONNX backends need
+    requirements-onnx.txt installed and export_model.py to have been run first.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{backend}', expected one of {BACKENDS}"
+        )
+
+    if backend == "fp32":
+        return Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+
+    if backend == "int8":
+        path = os.path.join(export_dir, INT8_FILENAME)
+        if os.path.exists(path):
+            # Build the quantized module structure from the config alone, then
+            # fill it with the exported int8 weights
+            config = Wav2Vec2Config.from_pretrained(model_name)
+            model = quantize_int8(Wav2Vec2ForCTC(config).eval())
+            model.load_state_dict(torch.load(path, weights_only=False))
+            return model
+        return quantize_int8(Wav2Vec2ForCTC.from_pretrained(model_name).eval())
+
+    filename = ONNX_FILENAME if backend == "onnx" else ONNX_INT8_FILENAME
+    path = os.path.join(export_dir, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} not found, run: python export_model.py --backend {backend}"
+        )
+    return OnnxWav2Vec2(path, Wav2Vec2Config.from_pretrained(model_name))
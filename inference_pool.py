@@ -0,0 +1,281 @@
+"""Dedicated inference worker pool shared by all HTTP workers.
+
+The server process loads the model once, then forks N pool workers that
+share the weights copy-on-write. Web workers talk to it over a local socket
+through InferenceClient, which has the same transcribe() interface as the
+in-process MicroBatcher.
+
+Server and clients find each other through INFERENCE_POOL_ADDRESS (a Unix
+socket path) and INFERENCE_POOL_AUTHKEY. gunicorn.conf.py generates both
+per launch; set them yourself to run the pool on its own.
+
+Usage: python inference_pool.py --size 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# Set in the server process before forking so workers inherit the weights
+_analyzer = None
+
+
+def pool_endpoint(address=None, authkey=None):
+    """(address, authkey) shared by server and clients, filled in from the environment"""
+    address = address or os.environ.get("INFERENCE_POOL_ADDRESS")
+    authkey = authkey or os.environ.get("INFERENCE_POOL_AUTHKEY", "").encode()
+    if not address or not authkey:
+        raise RuntimeError(
+            "INFERENCE_POOL_ADDRESS and INFERENCE_POOL_AUTHKEY must be set "
+            "(gunicorn.conf.py sets both when INFERENCE_POOL_SIZE > 0)"
+        )
+    return address, authkey
+
+
+def _private_socket_dir(address):
+    """Create the socket's directory for the service user only, or refuse a shared one"""
+    socket_dir = os.path.dirname(os.path.abspath(address))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if os.stat(socket_dir).st_mode & 0o077:
+        raise RuntimeError(
+            f"{socket_dir} is accessible to other users; "
+            "put INFERENCE_POOL_ADDRESS in a directory with mode 0700"
+        )
+
+
+def _init_worker(num_threads):
+    import torch
+
+    torch.set_num_threads(num_threads)
+    # First call in each worker pays allocator/kernel setup; do it up front
+    _transcribe(np.zeros(16000, dtype=np.float32))
+
+
+def _transcribe(waveform):
+    from batching import infer_batch
+
+    start = time.perf_counter()
+    (result,) = infer_batch(_analyzer.model, _analyzer.processor, [waveform])
+    # Plain NumPy pickles by value; torch tensors would try to share memory
+    return (result.text, result.logits.numpy()), time.perf_counter() - start
+
+
+class LatencyStats:
+    """Rolling window of job latencies with simple percentiles"""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            samples = np.array(self.samples) * 1000
+            count = self.count
+        if not len(samples):
+            return {"count": count, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        return {
+            "count": count,
+            "mean_ms": round(float(samples.mean()), 2),
+            "p50_ms": round(float(np.percentile(samples, 50)), 2),
+            "p99_ms": round(float(np.percentile(samples, 99)), 2),
+        }
+
+
+class InferenceServer:
+    """Accepts transcription jobs on a local socket and runs them in a process pool"""
+
+    def __init__(
+        self,
+        model_name,
+        size=2,
+        backend="fp32",
+        export_dir="models",
+        threads_per_worker=1,
+        address=None,
+        authkey=None,
+    ):
+        self.model_name = model_name
+        self.size = size
+        self.backend = backend
+        self.export_dir = export_dir
+        self.threads_per_worker = threads_per_worker
+        self.address, self.authkey = pool_endpoint(address, authkey)
+        self.pool = None
+        self.in_flight = 0
+        self.failed = 0
+        self.job_latency = LatencyStats()
+        self.compute_latency = LatencyStats()
+        self._lock = threading.Lock()
+
+    def start_pool(self):
+        global _analyzer
+        from pronunciation_analysis import setup_analyzer
+
+        # Preload in the parent; forked workers share these pages copy-on-write
+        _analyzer = setup_analyzer(
+            self.model_name, backend=self.backend, export_dir=self.export_dir
+        )
+        self.pool = multiprocessing.get_context("fork").Pool(
+            self.size,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,),
+        )
+
+    def stats(self):
+        with self._lock:
+            in_flight = self.in_flight
+            failed = self.failed
+        return {
+            "mode": "pool",
+            "pool_size": self.size,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.size),
+            "failed": failed,
+            "job_latency": self.job_latency.summary(),
+            "compute_latency": self.compute_latency.summary(),
+        }
+
+    def serve_forever(self):
+        _private_socket_dir(self.address)
+        if self.pool is None:
+            self.start_pool()
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            os.chmod(self.address, 0o600)
+            print(f"Inference pool of {self.size} workers listening on {self.address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except (AuthenticationError, OSError):
+                    # A client with the wrong key must not stop the server
+                    continue
+                threading.Thread(
+                    target=self._handle, args=(connection,), daemon=True
+                ).start()
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    kind, payload = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                if kind == "stats":
+                    connection.send(("ok", self.stats()))
+                    continue
+                if kind != "transcribe":
+                    connection.send(("error", f"Unknown job kind '{kind}'"))
+                    continue
+
+                with self._lock:
+                    self.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    result, compute_seconds = self.pool.apply(_transcribe, (payload,))
+                    response = ("ok", result)
+                    self.compute_latency.add(compute_seconds)
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    response = ("error", str(e))
+                finally:
+                    with self._lock:
+                        self.in_flight -= 1
+                self.job_latency.add(time.perf_counter() - start)
+                connection.send(response)
+
+
+class InferenceClient:
+    """Submits jobs to an InferenceServer; one connection per calling thread"""
+
+    def __init__(self, address=None, authkey=None):
+        self.address, self.authkey = pool_endpoint(address, authkey)
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = Client(self.address, authkey=self.authkey)
+            self._local.connection = connection
+        return connection
+
+    def _call(self, kind, payload=None):
+        connection = self._connection()
+        try:
+            connection.send((kind, payload))
+            status, result = connection.recv()
+        except (EOFError, OSError):
+            # Drop the broken connection so the next call reconnects
+            self._local.connection = None
+            raise
+        if status != "ok":
+            raise RuntimeError(f"Inference pool error: {result}")
+        return result
+
+    def transcribe(self, waveform, timeout=None):
+        """Same contract as MicroBatcher.transcribe: returns a Transcription"""
+        import torch
+        from batching import Transcription
+
+        text, logits = self._call("transcribe", np.asarray(waveform, dtype=np.float32))
+        return Transcription(text=text, logits=torch.from_numpy(logits))
+
+    def stats(self):
+        return self._call("stats")
+
+    def wait_until_available(self, timeout=600, interval=1.0):
+        """Block until the server accepts connections (it may still be loading)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.stats()
+            except (ConnectionRefusedError, FileNotFoundError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="adilism/wav2vec2-large-xlsr-kazakh")
+    parser.add_argument(
+        "--size", type=int, default=int(os.environ.get("INFERENCE_POOL_SIZE", "2"))
+    )
+    parser.add_argument(
+        "--backend", default=os.environ.get("INFERENCE_BACKEND", "fp32")
+    )
+    parser.add_argument(
+        "--export-dir", default=os.environ.get("MODEL_EXPORT_DIR", "models")
+    )
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--address", default=os.environ.get("INFERENCE_POOL_ADDRESS"))
+    args = parser.parse_args()
+
+    InferenceServer(
+        args.model,
+        size=args.size,
+        backend=args.backend,
+        export_dir=args.export_dir,
+        threads_per_worker=args.threads_per_worker,
+        address=args.address,
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
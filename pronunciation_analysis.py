@@ -1,15 +1,18 @@
 import torch
 import numpy as np
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
+from transformers import Wav2Vec2Config, Wav2Vec2Processor
 import librosa
-from scipy.signal import hilbert, find_peaks
-import Levenshtein
+
+from alignment import DELETE, EQUAL, REPLACE, PhonemeAligner
+from inference_backends import load_model
+from rhythm import rhythm_metrics
 
 
 class PronunciationAnalyzer:
-    def __init__(self, model, processor):
+    def __init__(self, model, processor, config=None):
         self.model = model
         self.processor = processor
+        self.config = model.config if model is not None else config
         self.similar_phonemes = {
             "қ": ["к", "х"],  # Similar sounds to қ
             "ғ": ["г"],  # Similar sounds to ғ
@@ -22,10 +25,17 @@ class PronunciationAnalyzer:
             "ы": ["і", "и"],  # Similar sounds to ы
             "и": ["і", "ы"],  # Similar sounds to и
         }
+        self.aligner = PhonemeAligner(self.similar_phonemes)
 
     def _get_default_analysis(self):
-        """Provide default values when analysis fails"""
+        """Provide default values when analysis fails
+
+        "failed" marks the placeholder so callers do not cache or store it
+        as a real result; the response builders leave it out.
+        """
         return {
+            "failed": True,
+            "predicted_text": "",
             "pronunciation_score": 0.0,
             "confidence": 0.0,
             "phoneme_analysis": {
@@ -45,30 +55,47 @@ class PronunciationAnalyzer:
 
     def _calculate_phoneme_similarity(self, reference_phoneme, predicted_phoneme):
         """Calculate similarity between two phonemes"""
-        if reference_phoneme == predicted_phoneme:
-            return 1.0
-        elif (
-            reference_phoneme in self.similar_phonemes
-            and predicted_phoneme in self.similar_phonemes[reference_phoneme]
-        ):
-            return 0.5
-        return 0.0
+        return self.aligner.similarity_of(reference_phoneme, predicted_phoneme)
+
+    def infer(self, waveform, sample_rate):
+        """Single forward pass returning CTC logits and the greedy transcription"""
+        inputs = self.processor(
+            waveform, sampling_rate=sample_rate, return_tensors="pt", padding=True
+        )
+
+        with torch.no_grad():
+            logits = self.model(inputs.input_values).logits
+
+        return self.decode(logits), logits
+
+    def decode(self, logits):
+        """Greedy CTC decoding of logits for a single utterance"""
+        predicted_ids = torch.argmax(logits, dim=-1)
+        return self.processor.batch_decode(predicted_ids)[0]
 
     def analyze_pronunciation(
-        self, waveform, sample_rate, reference_text, predicted_text
+        self, waveform, sample_rate, reference_text, predicted_text=None, logits=None
     ):
-        """Enhanced pronunciation analysis"""
+        """Enhanced pronunciation analysis
+
+        Pass the logits from an earlier forward pass (e.g. the micro-batcher) to
+        avoid running the model again; without them one pass is run here and
+        predicted_text is decoded from it when not given.
+        """
         try:
-            # Process audio through Wav2Vec2
-            inputs = self.processor(
-                waveform, sampling_rate=sample_rate, return_tensors="pt", padding=True
-            )
+            # Process audio through Wav2Vec2 unless logits were supplied
+            if logits is None:
+                decoded_text, logits = self.infer(waveform, sample_rate)
+            else:
+                decoded_text = None
 
-            with torch.no_grad():
-                outputs = self.model(inputs.input_values)
+            if predicted_text is None:
+                predicted_text = (
+                    decoded_text if decoded_text is not None else self.decode(logits)
+                )
 
             # Get confidence scores and phoneme analysis
-            probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            probs = torch.nn.functional.softmax(logits, dim=-1)
             confidence_scores = torch.max(probs, dim=-1)[0].mean().item()
 
             # Calculate detailed phoneme analysis
@@ -76,7 +103,7 @@ class PronunciationAnalyzer:
 
             # Get rhythm and timing metrics
             rhythm_metrics = self.calculate_rhythm_metrics(waveform, sample_rate)
-            timing_scores = self._analyze_timing(outputs.logits)
+            timing_scores = self._analyze_timing(logits)
 
             # Calculate overall score with new weighting
             overall_score = self._calculate_overall_score(
@@ -87,6 +114,7 @@ class PronunciationAnalyzer:
             )
 
             return {
+                "predicted_text": predicted_text,
                 "pronunciation_score": overall_score,
                 "confidence": confidence_scores,
                 "phoneme_analysis": phoneme_analysis,
@@ -125,25 +153,18 @@ class PronunciationAnalyzer:
     def calculate_rhythm_metrics(self, waveform, sample_rate):
         """Calculate rhythm-related metrics"""
         try:
-            analytic_signal = hilbert(waveform)
-            envelope = np.abs(analytic_signal)
-            peaks, _ = find_peaks(envelope, distance=int(sample_rate * 0.1))
-
-            speech_rate = len(peaks) / (len(waveform) / sample_rate)
-
-            if len(peaks) > 1:
-                peak_intervals = np.diff(peaks)
-                rhythm_regularity = np.std(peak_intervals) / np.mean(peak_intervals)
-            else:
-                rhythm_regularity = 0.5
-
-            return {"speech_rate": speech_rate, "rhythm_regularity": rhythm_regularity}
+            # Same peaks as find_peaks on |hilbert(waveform)|, from real FFTs
+            return rhythm_metrics(waveform, sample_rate)
         except Exception as e:
             print(f"Error in calculate_rhythm_metrics: {str(e)}")
             return {"speech_rate": 0.0, "rhythm_regularity": 1.0}
 
     def _analyze_phonemes(self, reference_text, predicted_text):
-        """Enhanced phoneme analysis"""
+        """Enhanced phoneme analysis
+
+        Details follow the reference text, with extra sounds at the place
+        they were inserted.
+        """
         analysis = {
             "total_phonemes": len(reference_text),
             "correct_phonemes": 0,
@@ -154,14 +175,7 @@ class PronunciationAnalyzer:
         ref_text = reference_text.lower()
         pred_text = predicted_text.lower()
 
-        # Calculate Levenshtein matrix for alignment
-        matrix = Levenshtein.editops(ref_text, pred_text)
-
-        # Analyze each phoneme
-        i = 0  # reference text index
-        j = 0  # predicted text index
-
-        if not matrix:  # Texts are identical
+        if ref_text == pred_text:  # Texts are identical
             for phoneme in ref_text:
                 analysis["correct_phonemes"] += 1
                 analysis["phoneme_details"].append(
@@ -175,64 +189,57 @@ class PronunciationAnalyzer:
             analysis["accuracy"] = 100.0
             return analysis
 
-        for op in matrix:
-            if op[0] == "equal":
+        # Similarity-weighted alignment, so near-misses line up as substitutions
+        edits = self.aligner.align(ref_text, pred_text)
+
+        details = analysis["phoneme_details"]
+        for op, i, j in edits:
+            if op == EQUAL:
                 # Exact match
-                phoneme = ref_text[i]
                 analysis["correct_phonemes"] += 1
-                analysis["phoneme_details"].append(
+                details.append(
                     {
-                        "phoneme": phoneme,
+                        "phoneme": ref_text[i],
                         "correct": True,
                         "similarity": 1.0,
                         "similar_to": [],
                     }
                 )
-                i += 1
-                j += 1
-            elif op[0] == "replace":
+            elif op == REPLACE:
                 # Substitution
                 ref_phoneme = ref_text[i]
                 pred_phoneme = pred_text[j]
-                similarity = self._calculate_phoneme_similarity(
-                    ref_phoneme, pred_phoneme
-                )
-                similar_sounds = self.similar_phonemes.get(ref_phoneme, [])
-                analysis["phoneme_details"].append(
+                details.append(
                     {
                         "phoneme": ref_phoneme,
                         "correct": False,
-                        "similarity": similarity,
+                        "similarity": self.aligner.similarity_of(
+                            ref_phoneme, pred_phoneme
+                        ),
                         "predicted_as": pred_phoneme,
-                        "similar_to": similar_sounds,
+                        "similar_to": self.similar_phonemes.get(ref_phoneme, []),
                     }
                 )
-                i += 1
-                j += 1
-            elif op[0] == "delete":
+            elif op == DELETE:
                 # Deletion
-                ref_phoneme = ref_text[i]
-                analysis["phoneme_details"].append(
+                details.append(
                     {
-                        "phoneme": ref_phoneme,
+                        "phoneme": ref_text[i],
                         "correct": False,
                         "similarity": 0.0,
                         "error": "omitted",
                     }
                 )
-                i += 1
-            elif op[0] == "insert":
+            else:
                 # Insertion
-                pred_phoneme = pred_text[j]
-                analysis["phoneme_details"].append(
+                details.append(
                     {
                         "phoneme": "∅",
                         "correct": False,
                         "similarity": 0.0,
-                        "extra": pred_phoneme,
+                        "extra": pred_text[j],
                     }
                 )
-                j += 1
 
         # Calculate overall accuracy
         analysis["accuracy"] = (
@@ -321,7 +328,14 @@ class PronunciationAnalyzer:
         return feedback
 
 
-def setup_analyzer(model_name):
+def setup_remote_analyzer(model_name):
+    """Analyzer without local weights; forward passes run in the inference pool"""
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    config = Wav2Vec2Config.from_pretrained(model_name)
+    return PronunciationAnalyzer(None, processor, config=config)
+
+
+def setup_analyzer(model_name, backend="fp32", export_dir="models"):
     processor = Wav2Vec2Processor.from_pretrained(model_name)
-    model = Wav2Vec2ForCTC.from_pretrained(model_name)
+    model = load_model(model_name, backend=backend, export_dir=export_dir)
     return PronunciationAnalyzer(model, processor)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Bump whenever a change alters the analysis output for the same audio
+ANALYZER_VERSION = "2"
+
+
+def result_cache_key(waveform, reference_text, version=ANALYZER_VERSION):
+    """Content hash of the decoded audio, the reference text and analyzer version"""
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(reference_text.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(np.ascontiguousarray(waveform, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Analysis results by content key: in-process LRU plus an optional disk tier
+
+    Entries are stored as JSON so callers always get a fresh copy. The disk
+    tier keeps one file per key and evicts least recently used files once
+    the directory grows past max_disk_bytes.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_bytes=256 * 2**20):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_files())
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(payload)
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, key, result):
+        payload = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    round((self.memory_hits + self.disk_hits) / lookups, 4)
+                    if lookups
+                    else 0.0
+                ),
+                "entries": len(self._entries),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _remember(self, key, payload):
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            # Touch so eviction treats this entry as recently used
+            os.utime(path)
+            return payload
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        # A unique temp name: several server processes may share the directory
+        with tempfile.NamedTemporaryFile(
+            dir=self.disk_dir, prefix=f"{key}.", suffix=".tmp", delete=False
+        ) as f:
+            f.write(payload)
+        os.replace(f.name, path)
+
+        with self._lock:
+            self._disk_bytes += len(payload) - replaced
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = sorted(self._disk_files(), key=lambda item: item[1])
+        total = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
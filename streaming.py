@@ -0,0 +1,143 @@
+import numpy as np
+import soxr
+import torch
+
+from audio_io import check_duration
+
+SAMPLE_FORMATS = {"pcm_s16le": "<i2", "pcm_f32le": "<f4"}
+
+
+class StreamingSession:
+    """Incremental CTC decoding of a live PCM stream on overlapping windows
+
+    Audio is cut into chunks; each chunk is run through the model together
+    with some left/right context (the stride) and only the logits for the
+    chunk itself are kept, so the stitched logits match a full pass closely
+    while inference overlaps with the learner still speaking. Streams longer
+    than max_duration seconds are rejected like long uploads are.
+    """
+
+    def __init__(
+        self,
+        analyzer,
+        batcher,
+        reference_text,
+        input_sample_rate=16000,
+        chunk_seconds=1.0,
+        stride_seconds=0.25,
+        sample_rate=16000,
+        max_duration=None,
+    ):
+        self.analyzer = analyzer
+        self.batcher = batcher
+        self.reference_text = reference_text
+        self.sample_rate = sample_rate
+        self.input_sample_rate = input_sample_rate
+        self.max_duration = max_duration
+        self.received = 0  # input samples, before resampling
+        self.pending = b""  # bytes of a sample split across frames
+
+        # Keep window boundaries on the model's frame grid (320 samples)
+        ratio = analyzer.config.inputs_to_logits_ratio
+        self.ratio = ratio
+        self.chunk = int(chunk_seconds * sample_rate) // ratio * ratio
+        self.stride = int(stride_seconds * sample_rate) // ratio * ratio
+
+        self.resampler = None
+        if input_sample_rate != sample_rate:
+            self.resampler = soxr.ResampleStream(
+                input_sample_rate, sample_rate, 1, dtype="float32"
+            )
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.decoded_until = 0  # samples whose logits are final
+        self.logits = []
+
+    def add_chunk(self, data, sample_format="pcm_s16le"):
+        """Append raw PCM bytes; returns a partial result when new text is decoded"""
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format '{sample_format}'")
+        dtype = np.dtype(SAMPLE_FORMATS[sample_format])
+
+        # Frames need not end on a sample boundary; carry the partial sample over
+        data = self.pending + bytes(data)
+        whole = len(data) - len(data) % dtype.itemsize
+        data, self.pending = data[:whole], data[whole:]
+
+        self.received += whole // dtype.itemsize
+        check_duration(self.received / self.input_sample_rate, self.max_duration)
+
+        samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+        if sample_format == "pcm_s16le":
+            samples /= 32768.0
+
+        if self.resampler is not None:
+            samples = self.resampler.resample_chunk(samples)
+        self.audio = np.concatenate([self.audio, samples])
+
+        decoded = False
+        while len(self.audio) >= self.decoded_until + self.chunk + self.stride:
+            self._decode_chunk(self.decoded_until + self.chunk)
+            decoded = True
+
+        return self.partial_result() if decoded else None
+
+    def finish(self):
+        """Decode the remaining audio and return the full analysis result"""
+        if self.resampler is not None:
+            tail = self.resampler.resample_chunk(
+                np.zeros(0, dtype=np.float32), last=True
+            )
+            self.audio = np.concatenate([self.audio, tail])
+
+        if len(self.audio) > self.decoded_until:
+            self._decode_chunk(len(self.audio))
+
+        logits = self._stitched_logits()
+        predicted_text = self.analyzer.decode(logits) if logits.shape[1] else ""
+        if not predicted_text:
+            return self.analyzer._get_default_analysis()
+
+        return self.analyzer.analyze_pronunciation(
+            waveform=self.audio,
+            sample_rate=self.sample_rate,
+            reference_text=self.reference_text,
+            predicted_text=predicted_text,
+            logits=logits,
+        )
+
+    def partial_result(self):
+        """Transcription so far plus interim alignment against the reference"""
+        logits = self._stitched_logits()
+        text = self.analyzer.decode(logits) if logits.shape[1] else ""
+        return {
+            "predicted_text": text,
+            "phoneme_analysis": self.analyzer._analyze_phonemes(
+                self.reference_text, text
+            ),
+            "duration": len(self.audio) / self.sample_rate,
+        }
+
+    def _decode_chunk(self, chunk_end):
+        chunk_start = self.decoded_until
+        window_start = max(0, chunk_start - self.stride)
+        window_end = min(len(self.audio), chunk_end + self.stride)
+        window = self.audio[window_start:window_end]
+
+        # The feature encoder needs at least one receptive field of audio
+        if len(window) < 400:
+            self.decoded_until = chunk_end
+            return
+
+        logits = self.batcher.transcribe(window).logits
+        first = (chunk_start - window_start) // self.ratio
+        last = (chunk_end - window_start) // self.ratio
+        if chunk_end == len(self.audio):
+            last = logits.shape[1]
+        self.logits.append(logits[:, first:last])
+        self.decoded_until = chunk_end
+
+    def _stitched_logits(self):
+        if not self.logits:
+            return torch.zeros(1, 0, self.analyzer.config.vocab_size)
+        return torch.cat(self.logits, dim=1)